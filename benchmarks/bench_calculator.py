@@ -0,0 +1,49 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+import calculator
+from calculator import Calculator
+
+OPERATORS = ["+", "-", "*", "/"]
+
+
+def make_expression(depth=0):
+    if depth > 3 or random.random() < 0.3:
+        return str(random.randint(1, 999))
+    if random.random() < 0.2:
+        return f"({make_expression(depth + 1)})"
+    return f"{make_expression(depth + 1)} {random.choice(OPERATORS)} {make_expression(depth + 1)}"
+
+
+def timed(function, expressions):
+    start = time.perf_counter()
+    for expression in expressions:
+        try:
+            function(expression)
+        except ZeroDivisionError:
+            pass
+    return (time.perf_counter() - start) / len(expressions)
+
+
+def main(count=20_000, unique=2_000):
+    random.seed(0)
+    pool = [make_expression() for _ in range(unique)]
+    expressions = [random.choice(pool) for _ in range(count)]
+    engine = Calculator()
+    print(f"Выражений: {count}, уникальных: {unique}")
+    print(f"eval: {timed(eval, expressions) * 1e6:.1f} мкс на выражение")
+    calculator.compile_expression.cache_clear()
+    print(f"разбор без кэша: {timed(lambda e: calculator.evaluate(calculator.compile_expression.__wrapped__(e)), expressions) * 1e6:.1f} мкс")
+    print(f"разбор с LRU-кэшем: {timed(engine.evaluate, expressions) * 1e6:.1f} мкс")
+    start = time.perf_counter()
+    for expression in ["9**9**9", "(" * 10_000 + "1" + ")" * 10_000, "2**100000"]:
+        engine.evaluate_many([expression])
+    print(f"отказ на патологических выражениях: {(time.perf_counter() - start) * 1e3:.2f} мс")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
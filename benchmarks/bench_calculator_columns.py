@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+import numpy as np
+
+from calculator import Calculator
+
+EXPRESSION = "amount * 1.2 - fee"
+
+
+def main(size=1_000_000, sample=20_000):
+    amounts = np.round(np.random.default_rng(0).uniform(-5000, 5000, size), 2)
+    calculator = Calculator()
+
+    start = time.perf_counter()
+    for amount in amounts[:sample].tolist():
+        calculator.evaluate(f"{amount} * 1.2 - 5")
+    per_value = (time.perf_counter() - start) / sample
+
+    start = time.perf_counter()
+    values = calculator.evaluate_columns(EXPRESSION, amount=amounts, fee=5)
+    vectorized = time.perf_counter() - start
+    assert np.allclose(values, amounts * 1.2 - 5)
+
+    print(f"Значений: {size}, выражение: {EXPRESSION}")
+    print(f"по одному значению: {per_value * 1e6:.1f} мкс на значение, ~{per_value * size:.1f} с на весь столбец")
+    print(f"векторно: {vectorized * 1e3:.1f} мс на весь столбец")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,51 @@
+import os
+import random
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+from finance_store import FinanceRecord, FinanceStore
+
+
+def make_items(size):
+    start = date(2015, 1, 1)
+    random.seed(size)
+    return [
+        {
+            "id": record_id,
+            "amount": random.uniform(-1000, 1000),
+            "category": f"Категория {record_id % 30}",
+            "date": (start + timedelta(days=random.randrange(3650))).strftime("%d-%m-%Y"),
+            "description": "",
+        }
+        for record_id in range(1, size + 1)
+    ]
+
+
+def main(sizes=(100_000, 1_000_000), repeat=5):
+    date_from = datetime(2020, 3, 1)
+    date_to = datetime(2020, 3, 31)
+    for size in sizes:
+        items = make_items(size)
+        records = [FinanceRecord.from_dict(item) for item in items]
+        store = FinanceStore.from_dicts(items)
+        store.date_index()
+
+        def old_path():
+            return [record for record in records if date_from <= datetime.strptime(record.date, "%d-%m-%Y") <= date_to]
+
+        def new_path():
+            return list(store.iter_positions(store.date_range(date_from, date_to)))
+
+        assert sorted(record.id for record in old_path()) == sorted(record.id for record in new_path())
+        old = timeit.timeit(old_path, number=1)
+        new = timeit.timeit(new_path, number=repeat) / repeat
+        print(f"Записей: {size}, найдено: {len(new_path())}")
+        print(f"  strptime на каждую запись: {old * 1000:.1f} мс")
+        print(f"  индекс дат: {new * 1000:.3f} мс (x{old / new:.0f})")
+
+
+if __name__ == "__main__":
+    main()
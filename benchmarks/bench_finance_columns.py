@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+import numpy as np
+
+import storage
+
+
+def resident_mb():
+    with open("/proc/self/status", "r", encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def generate(directory, size, format_name):
+    from finance_store import FinanceStore
+
+    rng = np.random.default_rng(0)
+    store = FinanceStore(size)
+    categories = ["Еда", "Транспорт", "Дом", "Зарплата", "Развлечения", "Здоровье"]
+    chunk = 1_000_000
+    for start in range(0, size, chunk):
+        count = min(chunk, size - start)
+        store.extend(
+            np.arange(start + 1, start + count + 1),
+            np.round(rng.uniform(-5000, 5000, count), 2),
+            [categories[code] for code in rng.integers(0, len(categories), count)],
+            np.datetime64("2015-01-01") + rng.integers(0, 3650, count),
+            [f"Операция {i}" for i in range(start + 1, start + count + 1)],
+        )
+    file_name = os.path.join(directory, "finance.json")
+    target = storage.ColumnarStorage(file_name, list) if format_name == "columns" else \
+        storage.JournalStorage(file_name, list, table="finance", snapshot_format=format_name)
+    target.write_snapshot(size + 1, store if format_name == "columns" else store.to_dicts())
+
+
+def child(directory):
+    from financial_records import FinanceManager
+
+    start = time.perf_counter()
+    manager = FinanceManager(os.path.join(directory, "finance.json"))
+    startup = time.perf_counter() - start
+    startup_memory = resident_mb()
+    start = time.perf_counter()
+    report = manager.report("01-03-2020", "31-03-2020")
+    report_time = time.perf_counter() - start
+    print(json.dumps({
+        "records": len(manager.records),
+        "startup": startup,
+        "startup_memory": startup_memory,
+        "report": report_time,
+        "report_count": report.count,
+        "memory": resident_mb(),
+    }))
+
+
+def measure(directory):
+    output = subprocess.run([sys.executable, __file__, "--child", directory], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)
+
+
+def main(size=2_000_000):
+    print(f"Финансовых записей: {size}")
+    for format_name in ("json", "columns"):
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, size, format_name)
+            result = measure(directory)
+        print(f"{format_name:>8}: запуск {result['startup']:.2f} с ({result['startup_memory']:.0f} МБ), "
+              f"отчёт за месяц {result['report'] * 1e3:.1f} мс ({result['report_count']} записей), "
+              f"память после отчёта {result['memory']:.0f} МБ")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2])
+    else:
+        main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,56 @@
+import os
+import sys
+import timeit
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+from financial_records import FinanceManager
+
+
+def make_chunk(size):
+    rng = np.random.default_rng(size)
+    days = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, size), unit="D")
+    chunk = pd.DataFrame({
+        "amount": np.round(rng.uniform(-1000, 1000, size), 2).astype(str),
+        "category": rng.choice(["Еда", "Транспорт", "Зарплата", "Кафе"], size),
+        "date": days.strftime("%d-%m-%Y"),
+        "description": "",
+    })
+    chunk.loc[::100, "amount"] = "abc"
+    chunk.loc[50::100, "date"] = "31-02-2020"
+    chunk.index = pd.RangeIndex(1, size + 1)
+    return chunk
+
+
+def validate_by_row(chunk):
+    clean, errors = [], 0
+    for _, row in chunk.iterrows():
+        try:
+            amount = float(row["amount"])
+            datetime.strptime(row["date"].strip(), "%d-%m-%Y")
+        except ValueError:
+            errors += 1
+            continue
+        clean.append((amount, row["category"].strip(), row["date"].strip(), row.get("description", "").strip()))
+    return clean, errors
+
+
+def main(size=1_000_000):
+    chunk = make_chunk(size)
+    start = timeit.default_timer()
+    old_clean, _ = validate_by_row(chunk)
+    old = timeit.default_timer() - start
+    new = timeit.timeit(lambda: FinanceManager.validate_chunk(chunk), number=1)
+    clean, rejected = FinanceManager.validate_chunk(chunk)
+    assert len(clean) == len(old_clean)
+    print(f"Строк: {size}, корректных: {len(clean)}, с ошибками: {len(rejected)}")
+    print(f"  построчная проверка (iterrows): {old:.2f} с")
+    print(f"  векторная проверка: {new:.2f} с (x{old / new:.0f})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
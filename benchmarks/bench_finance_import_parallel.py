@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+import numpy as np
+
+import storage
+from financial_records import FinanceManager
+
+CATEGORIES = ["Еда", "Транспорт", "Дом", "Зарплата", "Развлечения", "Здоровье"]
+
+
+def write_exports(directory, files, rows):
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    for month in range(files):
+        days = np.datetime64("2023-01-01") + rng.integers(0, 365, rows)
+        pd.DataFrame({
+            "amount": np.round(rng.uniform(-5000, 5000, rows), 2),
+            "category": np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), rows)],
+            "date": pd.Series(days).dt.strftime("%d-%m-%Y"),
+            "description": [f"Операция {i}" for i in range(rows)],
+        }).to_csv(os.path.join(directory, f"export-{month:02d}.csv"), index=False, encoding="utf-8")
+
+
+def measure(directory, workers):
+    file_name = os.path.join(directory, f"finance-{workers}.json")
+    manager = FinanceManager(file_name)
+    file_names = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.startswith("export-")
+    )
+    start = time.perf_counter()
+    results = manager.import_files(file_names, workers)
+    manager.storage.flush()
+    elapsed = time.perf_counter() - start
+    assert all(error is None for _, _, _, error in results)
+    return elapsed, sum(imported for _, imported, _, _ in results)
+
+
+def main(files=24, rows=50_000):
+    storage.FLUSH_DELAY = 0
+    with tempfile.TemporaryDirectory() as directory:
+        write_exports(directory, files, rows)
+        print(f"Файлов: {files} по {rows} строк, ядер: {os.cpu_count()}")
+        for workers in (1, 2, 4, None):
+            elapsed, imported = measure(directory, workers)
+            print(f"процессов {workers or os.cpu_count()}: {elapsed:.2f} с ({imported} записей)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+import numpy as np
+
+from finance_report import FinanceReport
+from finance_rollups import FinanceRollups
+from finance_store import FinanceStore
+
+CATEGORIES = ["Еда", "Транспорт", "Дом", "Зарплата", "Развлечения", "Здоровье"]
+PERIODS = [("2020-03-01", "2020-03-31"), ("2016-01-15", "2023-11-20"), ("2015-01-01", "2024-12-31")]
+
+
+def make_store(size):
+    rng = np.random.default_rng(0)
+    store = FinanceStore(size)
+    store.extend(
+        np.arange(1, size + 1),
+        np.round(rng.uniform(-5000, 5000, size), 2),
+        [CATEGORIES[code] for code in rng.integers(0, len(CATEGORIES), size)],
+        np.datetime64("2015-01-01") + rng.integers(0, 3650, size),
+        [""] * size,
+    )
+    return store
+
+
+def timed(function, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(size=1_000_000):
+    store = make_store(size)
+    store.date_index()
+    build, rollups = timed(lambda: FinanceRollups.from_store(store), repeat=1)
+    print(f"Финансовых записей: {size}, построение агрегатов {build:.2f} с")
+    for date_from, date_to in PERIODS:
+        date_from, date_to = np.datetime64(date_from).item(), np.datetime64(date_to).item()
+        scan, expected = timed(lambda: FinanceReport(store, date_from, date_to))
+        rolled, report = timed(lambda: FinanceReport(store, date_from, date_to, rollups))
+        assert report.count == expected.count and abs(report.balance - expected.balance) < 1e-3
+        print(f"{date_from:%d-%m-%Y}..{date_to:%d-%m-%Y} ({report.count} записей): "
+              f"сканирование {scan * 1e3:.1f} мс, агрегаты {rolled * 1e3:.2f} мс")
+    inserts = 1000
+    start = time.perf_counter()
+    for i in range(inserts):
+        position = len(store)
+        store.extend([size + i + 1], [100.0], ["Еда"], np.array(["2024-06-01"], dtype="datetime64[D]"), [""])
+        rollups.add_rows(store, position, len(store))
+    print(f"Обновление агрегатов при добавлении записи: {(time.perf_counter() - start) / inserts * 1e3:.3f} мс")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
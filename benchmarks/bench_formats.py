@@ -0,0 +1,58 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+import serialization
+from storage import JournalStorage
+
+CATEGORIES = ["Еда", "Транспорт", "Дом", "Зарплата", "Развлечения", "Здоровье"]
+
+
+def make_records(size):
+    random.seed(0)
+    return [
+        {
+            "id": i,
+            "amount": round(random.uniform(-5000, 5000), 2),
+            "category": random.choice(CATEGORIES),
+            "date": f"{random.randint(1, 28):02d}-{random.randint(1, 12):02d}-{random.randint(2015, 2024)}",
+            "description": f"Операция номер {i}",
+        }
+        for i in range(1, size + 1)
+    ]
+
+
+def measure(directory, format_name, items):
+    file_name = os.path.join(directory, f"finance-{format_name}.json")
+    storage = JournalStorage(file_name, lambda: items, flush_delay=0, table="finance", snapshot_format=format_name)
+    start = time.perf_counter()
+    storage.save(items)
+    save_time = time.perf_counter() - start
+    start = time.perf_counter()
+    loaded = JournalStorage(file_name, list, table="finance").load()
+    load_time = time.perf_counter() - start
+    assert len(loaded) == len(items) and loaded[-1] == items[-1], format_name
+    return save_time, load_time, os.path.getsize(file_name)
+
+
+def main(size=200_000):
+    items = make_records(size)
+    print(f"Финансовых записей: {size}, orjson: {'да' if serialization.orjson else 'нет'}")
+    with tempfile.TemporaryDirectory() as directory:
+        for format_name in serialization.FORMATS:
+            if format_name == "msgpack" and serialization.msgpack is None:
+                print(f"{format_name:>8}: пропущен, пакет msgpack не установлен")
+                continue
+            if format_name == "columns":
+                print(f"{format_name:>8}: пропущен, см. bench_finance_columns.py")
+                continue
+            save_time, load_time, size_bytes = measure(directory, format_name, items)
+            print(f"{format_name:>8}: запись {save_time:.2f} с, чтение {load_time:.2f} с, размер {size_bytes / 2 ** 20:.1f} МБ")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
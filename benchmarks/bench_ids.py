@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+from notes import Note, NotesManager
+
+
+def main(size=1_000_000, repeat=1000):
+    with tempfile.TemporaryDirectory() as directory:
+        manager = NotesManager(os.path.join(directory, "notes.json"))
+        for _ in range(size):
+            note_id = manager.storage.allocate_id()
+            manager.notes[note_id] = Note(note_id, "Заголовок", "Текст", "01-01-2024 00:00:00")
+        notes_list = list(manager.notes.values())
+        target = size // 2
+
+        old_lookup = timeit.timeit(lambda: next((note for note in notes_list if note.id == target), None), number=10) / 10
+        new_lookup = timeit.timeit(lambda: manager.notes.get(target), number=repeat) / repeat
+        old_allocate = timeit.timeit(lambda: max([note.id for note in notes_list], default=0) + 1, number=10) / 10
+        new_allocate = timeit.timeit(manager.storage.allocate_id, number=repeat) / repeat
+
+        def delete_and_restore():
+            note = manager.notes.pop(target)
+            manager.notes[target] = note
+
+        old_delete = timeit.timeit(lambda: [note for note in notes_list if note.id != target], number=10) / 10
+        new_delete = timeit.timeit(delete_and_restore, number=repeat) / repeat
+
+    print(f"Записей: {size}")
+    for name, old, new in [
+        ("поиск по ID", old_lookup, new_lookup),
+        ("выделение ID", old_allocate, new_allocate),
+        ("удаление", old_delete, new_delete),
+    ]:
+        print(f"{name}: список {old * 1e6:.1f} мкс, индекс {new * 1e6:.3f} мкс (x{old / new:.0f})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
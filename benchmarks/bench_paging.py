@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+import numpy as np
+
+from finance_store import FinanceStore
+from financial_records import FinanceManager
+from paging import Pager, write_lines
+
+CATEGORIES = ["Еда", "Транспорт", "Дом", "Зарплата", "Развлечения", "Здоровье"]
+
+
+def make_store(size):
+    rng = np.random.default_rng(0)
+    store = FinanceStore(size)
+    store.extend(
+        np.arange(1, size + 1),
+        np.round(rng.uniform(-5000, 5000, size), 2),
+        [CATEGORIES[code] for code in rng.integers(0, len(CATEGORIES), size)],
+        np.datetime64("2015-01-01") + rng.integers(0, 3650, size),
+        [f"Операция {i}" for i in range(1, size + 1)],
+    )
+    return store
+
+
+def main(size=500_000):
+    store = make_store(size)
+    format_record = FinanceManager.format_record
+    stdout = sys.stdout
+    try:
+        sys.stdout = io.StringIO()
+        start = time.perf_counter()
+        for record in list(store):
+            print(format_record(record))
+        print_all = time.perf_counter() - start
+
+        sys.stdout = io.StringIO()
+        start = time.perf_counter()
+        write_lines(map(format_record, store))
+        buffered_all = time.perf_counter() - start
+
+        sys.stdout = io.StringIO()
+        start = time.perf_counter()
+        write_lines(map(format_record, Pager(iter(store)).next_page()))
+        first_page = time.perf_counter() - start
+    finally:
+        sys.stdout = stdout
+    print(f"Финансовых записей: {size}")
+    print(f"список и print по строке: {print_all:.2f} с, буферизованный поток: {buffered_all:.2f} с, "
+          f"первая страница: {first_page * 1e3:.2f} мс")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+import storage
+from notes import NotesManager
+
+
+def measure(directory, name, size, operations, flush_delay, rewrite=False):
+    storage.FLUSH_DELAY = flush_delay
+    file_name = os.path.join(directory, f"{name}.json")
+    manager = NotesManager(file_name)
+    with manager.batch():
+        for i in range(size):
+            manager.insert(f"Заметка {i}", "текст " * 20)
+    manager.storage.flush()
+
+    start = time.perf_counter()
+    for i in range(operations):
+        manager.insert(f"Новая {i}", "текст")
+        if rewrite:
+            manager.save_notes()
+    elapsed = (time.perf_counter() - start) / operations
+    manager.storage.flush()
+    saved = len(NotesManager(file_name).notes)
+    assert saved == size + operations, saved
+    return elapsed
+
+
+def main(operations=200):
+    print(f"Средняя задержка одного изменения, {operations} изменений подряд:")
+    for size in (1_000, 10_000, 100_000):
+        with tempfile.TemporaryDirectory() as directory:
+            rewrite = measure(directory, "rewrite", size, min(operations, 20), 0, rewrite=True)
+            sync = measure(directory, "sync", size, operations, 0)
+            debounced = measure(directory, "debounced", size, operations, 0.2)
+        print(f"{size} заметок: перезапись файла {rewrite * 1e3:.2f} мс, "
+              f"журнал с fsync {sync * 1e3:.2f} мс, отложенная запись {debounced * 1e3:.3f} мс")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
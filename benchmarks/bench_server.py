@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+from notes import NotesManager
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "..", "personal_assistant", "personal_assistant.py")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def client(port, requests, make_request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for i in range(requests):
+        status = await request(reader, writer, *make_request(i))
+        if status >= 400:
+            raise RuntimeError(f"статус {status}")
+    writer.close()
+
+
+async def run(port, name, clients, requests, make_request):
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, requests, make_request) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    total = clients * requests
+    print(f"{name}: {total} запросов за {elapsed:.2f} с, {total / elapsed:.0f} запросов/с")
+
+
+async def scenarios(port, clients, requests):
+    await run(port, "POST /notes", clients, requests,
+              lambda i: ("POST", "/notes", {"title": f"Заметка {i}", "content": "текст заметки"}))
+    await run(port, "GET /notes/{id}", clients, requests, lambda i: ("GET", f"/notes/{i % requests + 1}"))
+    await run(port, "POST /finance", clients, requests,
+              lambda i: ("POST", "/finance", {"amount": i % 200 - 100, "category": f"к{i % 10}", "date": f"{i % 28 + 1:02d}-01-2024"}))
+    await run(port, "GET /finance/report", clients, requests // 10,
+              lambda i: ("GET", "/finance/report?from=01-01-2024&to=31-12-2024"))
+
+
+def main(clients=16, requests=500):
+    with tempfile.TemporaryDirectory() as directory:
+        port = free_port()
+        server = subprocess.Popen([sys.executable, SCRIPT, "serve", "--port", str(port)],
+                                  cwd=directory, stdout=subprocess.PIPE, text=True)
+        try:
+            server.stdout.readline()
+            print(f"Клиентов: {clients}, запросов на клиента: {requests}")
+            asyncio.run(scenarios(port, clients, requests))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=10)
+        saved = len(NotesManager(os.path.join(directory, "notes.json")).notes)
+        print(f"Сохранено заметок после остановки сервера: {saved} из {clients * requests}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+SOURCE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+STARTUP_CODE = (
+    "import time; start = time.perf_counter(); "
+    "from main_manager import MainManager; MainManager(); "
+    "print(time.perf_counter() - start)"
+)
+HEAVY_MODULES = ["pandas", "numpy"]
+
+
+def measure_startup():
+    with tempfile.TemporaryDirectory() as directory:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+            cwd=directory,
+            env={**os.environ, "PYTHONPATH": SOURCE_DIR},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return float(result.stdout), modules
+
+
+def main(limit_ms=500):
+    elapsed, modules = measure_startup()
+    total_ms = elapsed * 1000
+    print(f"Импорт main_manager: {modules.get('main_manager', 0) / 1000:.1f} мс")
+    print(f"Запуск MainManager(): {total_ms:.1f} мс (лимит {limit_ms} мс)")
+    loaded = [name for name in HEAVY_MODULES if name in modules]
+    if loaded:
+        print(f"Ошибка: при запуске загружены тяжёлые модули: {', '.join(loaded)}")
+        return 1
+    if total_ms > limit_ms:
+        print("Ошибка: время запуска превышает лимит.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
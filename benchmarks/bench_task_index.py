@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+from task_index import TaskIndex
+from tasks import PRIORITIES, Task
+
+
+def make_tasks(size):
+    random.seed(0)
+    start = date.today() - timedelta(days=365)
+    return {
+        i: Task(i, f"Задача {i}", "", done=random.random() < 0.5, priority=random.choice(PRIORITIES),
+                due_date=(start + timedelta(days=random.randint(0, 730))).strftime("%d-%m-%Y"))
+        for i in range(1, size + 1)
+    }
+
+
+def scan(tasks, first, last):
+    found = [
+        task for task in tasks.values()
+        if not task.done and task.priority == "Высокий"
+        and first <= datetime.strptime(task.due_date, "%d-%m-%Y").toordinal() <= last
+    ]
+    return sorted(found, key=lambda task: task.id)[:20]
+
+
+def timed(function, repeat=10):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(size=200_000):
+    tasks = make_tasks(size)
+    index = TaskIndex(PRIORITIES)
+    build, _ = timed(lambda: index.rebuild(tasks.values()), repeat=1)
+    today = date.today().toordinal()
+    scanned, expected = timed(lambda: scan(tasks, today, today + 6), repeat=3)
+
+    def indexed_query():
+        task_ids = index.select(False, "Высокий", today, today + 6)
+        return [tasks[task_id] for task_id in index.page(task_ids, tasks, limit=20)]
+
+    indexed, result = timed(indexed_query, repeat=100)
+    assert result == expected
+    full, _ = timed(lambda: index.page(index.select(), tasks, sort_by="due_date"), repeat=3)
+    paged, _ = timed(lambda: index.page(index.select(), tasks, sort_by="due_date", offset=40, limit=20), repeat=3)
+    print(f"Задач: {size}, построение индексов {build * 1e3:.0f} мс")
+    print(f"не выполнена И Высокий И срок на этой неделе: перебор {scanned * 1e3:.1f} мс, индексы {indexed * 1e3:.2f} мс")
+    print(f"сортировка по сроку: весь список {full * 1e3:.0f} мс, третья страница {paged * 1e3:.0f} мс")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
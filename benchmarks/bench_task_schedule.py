@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "personal_assistant"))
+
+from task_schedule import DueSchedule
+from tasks import PRIORITIES, Task
+
+
+def make_tasks(size):
+    random.seed(0)
+    start = date.today() - timedelta(days=365)
+    return [
+        Task(i, f"Задача {i}", "", done=random.random() < 0.3, priority=random.choice(PRIORITIES),
+             due_date=(start + timedelta(days=random.randint(0, 730))).strftime("%d-%m-%Y"))
+        for i in range(1, size + 1)
+    ]
+
+
+def scan_next_due(tasks, count, today):
+    pending = [
+        (datetime.strptime(task.due_date, "%d-%m-%Y").toordinal(), PRIORITIES.index(task.priority), task.id)
+        for task in tasks if not task.done and task.due_date
+    ]
+    return [key[2] for key in sorted(key for key in pending if key[0] >= today)[:count]]
+
+
+def timed(function, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(size=100_000):
+    tasks = make_tasks(size)
+    today = date.today().toordinal()
+    schedule = DueSchedule(PRIORITIES)
+    build, _ = timed(lambda: schedule.rebuild(tasks), repeat=1)
+    scan, expected = timed(lambda: scan_next_due(tasks, 10, today), repeat=3)
+    indexed, result = timed(lambda: schedule.next_due(10, today), repeat=1000)
+    assert result == expected
+    overdue, _ = timed(lambda: schedule.overdue(today))
+    week, _ = timed(lambda: schedule.due_between(today, today + 6), repeat=1000)
+    update, _ = timed(lambda: schedule.add(tasks[size // 2]), repeat=1000)
+    print(f"Задач: {size}, построение индекса {build * 1e3:.0f} мс")
+    print(f"10 ближайших: перебор {scan * 1e3:.1f} мс, индекс {indexed * 1e6:.1f} мкс")
+    print(f"просроченные: {overdue * 1e3:.2f} мс, сроки на неделю: {week * 1e6:.1f} мкс, "
+          f"обновление задачи: {update * 1e6:.1f} мкс")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
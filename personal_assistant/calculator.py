@@ -1,15 +1,214 @@
+import math
+import operator
+from functools import lru_cache
+
+
+MAX_LENGTH = 1000
+MAX_DEPTH = 100
+MAX_DIGITS = 1000
+MAX_BITS = int(MAX_DIGITS * math.log2(10))
+CACHE_SIZE = 4096
+
+BINARY = {
+    "+": (1, False, operator.add),
+    "-": (1, False, operator.sub),
+    "*": (2, False, operator.mul),
+    "/": (2, False, operator.truediv),
+    "//": (2, False, operator.floordiv),
+    "**": (4, True, operator.pow),
+}
+UNARY = {
+    "u+": (3, operator.pos),
+    "u-": (3, operator.neg),
+}
+
+
+class Variable:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+def tokenize(expression):
+    tokens = []
+    position, length = 0, len(expression)
+    while position < length:
+        char = expression[position]
+        if char.isspace():
+            position += 1
+        elif char.isdigit() or char == ".":
+            start = position
+            while position < length and (expression[position].isdigit() or expression[position] == "."):
+                position += 1
+            text = expression[start:position]
+            try:
+                tokens.append(float(text) if "." in text else int(text))
+            except ValueError:
+                raise ValueError(f"некорректное число {text}") from None
+        elif char.isalpha() or char == "_":
+            start = position
+            while position < length and (expression[position].isalnum() or expression[position] == "_"):
+                position += 1
+            tokens.append(Variable(expression[start:position]))
+        elif expression.startswith(("**", "//"), position):
+            tokens.append(expression[position:position + 2])
+            position += 2
+        elif char in "+-*/()":
+            tokens.append(char)
+            position += 1
+        else:
+            raise ValueError("недопустимые символы в выражении")
+    return tokens
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(expression):
+    if len(expression) > MAX_LENGTH:
+        raise ValueError(f"выражение длиннее {MAX_LENGTH} символов")
+    output, stack = [], []
+    depth = 0
+    expect_operand = True
+    for token in tokenize(expression):
+        if not isinstance(token, str):
+            if not expect_operand:
+                raise ValueError("пропущен оператор")
+            output.append(token)
+            expect_operand = False
+        elif token == "(":
+            if not expect_operand:
+                raise ValueError("пропущен оператор")
+            depth += 1
+            if depth > MAX_DEPTH:
+                raise ValueError(f"вложенность скобок больше {MAX_DEPTH}")
+            stack.append(token)
+        elif token == ")":
+            if expect_operand:
+                raise ValueError("некорректное выражение")
+            while stack and stack[-1] != "(":
+                output.append(stack.pop())
+            if not stack:
+                raise ValueError("лишняя закрывающая скобка")
+            stack.pop()
+            depth -= 1
+        elif expect_operand:
+            if token not in ("+", "-"):
+                raise ValueError("некорректное выражение")
+            stack.append("u" + token)
+        else:
+            precedence, right, _ = BINARY[token]
+            while stack and stack[-1] != "(":
+                top = stack[-1]
+                top_precedence = UNARY[top][0] if top in UNARY else BINARY[top][0]
+                if top_precedence > precedence or (top_precedence == precedence and not right):
+                    output.append(stack.pop())
+                else:
+                    break
+            stack.append(token)
+            expect_operand = True
+    if expect_operand:
+        raise ValueError("некорректное выражение")
+    while stack:
+        token = stack.pop()
+        if token == "(":
+            raise ValueError("не закрыта скобка")
+        output.append(token)
+    return tuple(output)
+
+
+def check_size(value):
+    if isinstance(value, int) and value.bit_length() > MAX_BITS:
+        raise ValueError("слишком большой результат")
+    return value
+
+
+def power(base, exponent):
+    if isinstance(exponent, int) and abs(base) > 1 and exponent > MAX_DIGITS / math.log10(abs(base)):
+        raise ValueError("слишком большой результат")
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise ValueError("результат не является действительным числом")
+    return check_size(result)
+
+
+def evaluate(program, variables=None):
+    stack = []
+    for token in program:
+        if isinstance(token, Variable):
+            if variables is None or token.name not in variables:
+                raise ValueError(f"неизвестная переменная {token.name}")
+            stack.append(variables[token.name])
+        elif not isinstance(token, str):
+            stack.append(token)
+        elif token in UNARY:
+            stack.append(UNARY[token][1](stack.pop()))
+        else:
+            right = stack.pop()
+            left = stack.pop()
+            if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                stack.append(BINARY[token][2](left, right))
+            elif token == "**":
+                stack.append(power(left, right))
+            else:
+                stack.append(check_size(BINARY[token][2](left, right)))
+    return stack[0]
+
+
+def variable_names(expression):
+    return sorted({token.name for token in compile_expression(expression.strip()) if isinstance(token, Variable)})
+
+
+def evaluate_columns(expression, variables):
+    import numpy as np
+
+    program = compile_expression(expression.strip())
+    columns = {name: np.asarray(value, dtype="float64") for name, value in variables.items()}
+    shape = np.broadcast_shapes(*(column.shape for column in columns.values()))
+    try:
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            result = evaluate(program, columns)
+    except ZeroDivisionError:
+        raise ValueError("деление на ноль") from None
+    except ArithmeticError as e:
+        raise ValueError(str(e)) from None
+    return np.broadcast_to(np.asarray(result, dtype="float64"), shape).copy()
+
+
 class Calculator:
-    def __init__(self):
-        self.allowed_operators = ["+", "-", "*", "/", "(", ")"]
+    def evaluate(self, expression):
+        return evaluate(compile_expression(expression.strip()))
 
-    def calculate(self, expression):
-        if all(char.isdigit() or char.isspace() or char in self.allowed_operators for char in expression):
+    def evaluate_columns(self, expression, **variables):
+        return evaluate_columns(expression, variables)
+
+    def evaluate_many(self, expressions):
+        results = []
+        for expression in expressions:
+            expression = expression.strip()
+            if not expression:
+                continue
             try:
-                result = eval(expression)
-                print(result)
+                results.append((expression, self.evaluate(expression), None))
             except ZeroDivisionError:
-                print("Ошибка: деление на ноль")
-            except Exception as e:
-                print(f"Ошибка: {str(e)}")
-        else:
-            print("Ошибка: недопустимые символы в выражении")
+                results.append((expression, None, "деление на ноль"))
+            except (ArithmeticError, ValueError) as e:
+                results.append((expression, None, str(e)))
+        return results
+
+    def calculate(self, expression):
+        try:
+            print(self.evaluate(expression))
+        except ZeroDivisionError:
+            print("Ошибка: деление на ноль")
+        except Exception as e:
+            print(f"Ошибка: {str(e)}")
+
+    def calculate_file(self, file_name):
+        try:
+            with open(file_name, "r", encoding="utf-8") as file:
+                results = self.evaluate_many(file)
+        except FileNotFoundError:
+            print("Ошибка: файл не найден.")
+            return
+        for expression, result, error in results:
+            print(f"{expression} = {result}" if error is None else f"{expression}: ошибка: {error}")
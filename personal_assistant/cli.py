@@ -0,0 +1,304 @@
+import argparse
+import json
+import math
+import sqlite3
+import sys
+from contextlib import ExitStack
+
+import serialization
+import storage
+from csv_import import find_csv_files
+from main_manager import MANAGERS, MainManager
+from paging import Pager, after_cursor, write_lines
+from task_index import SORT_KEYS
+
+
+ITEMS = {
+    "notes": "notes",
+    "tasks": "tasks",
+    "contacts": "contacts",
+    "finance": "records",
+}
+DUMPS = {
+    "notes": "dump_notes",
+    "tasks": "dump_tasks",
+    "contacts": "dump_contacts",
+    "finance": "dump_records",
+}
+OPERATIONS = {
+    "add": "insert",
+    "update": "update",
+    "delete": "remove",
+    "done": "complete",
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="personal_assistant", description="Персональный помощник")
+    parser.add_argument("--db", help="файл базы данных SQLite (.db/.sqlite) вместо JSON-файлов")
+    parser.add_argument("--flush-delay", type=float, help="задержка фоновой записи изменений на диск, с (0 — сразу)")
+    parser.add_argument("--format", choices=serialization.FORMATS,
+                        help="формат файлов данных: pretty, json (по умолчанию), jsonl, msgpack; для финансов также struct "
+                             "и columns (колонки в отдельных файлах, открываются через mmap)")
+    commands = parser.add_subparsers(dest="command")
+
+    add = commands.add_parser("add", help="добавить запись: add KIND поле=значение ...")
+    add.add_argument("kind", choices=MANAGERS)
+    add.add_argument("fields", nargs="*")
+
+    listing = commands.add_parser("list", help="вывести все записи в формате JSON Lines")
+    listing.add_argument("kind", choices=MANAGERS)
+    listing.add_argument("--after", type=int, help="продолжить со следующей записи после указанного ID")
+    listing.add_argument("--limit", type=int, help="вывести не больше N записей")
+
+    filtering = commands.add_parser("filter", help="отфильтровать задачи или финансовые записи")
+    filtering.add_argument("kind", choices=["tasks", "finance"])
+    filtering.add_argument("--from", dest="date_from")
+    filtering.add_argument("--to", dest="date_to")
+    filtering.add_argument("--category")
+    filtering.add_argument("--status")
+    filtering.add_argument("--priority")
+    filtering.add_argument("--due-date")
+    filtering.add_argument("--overdue", action="store_true", help="невыполненные задачи с истёкшим сроком")
+    filtering.add_argument("--next", type=int, help="N ближайших по сроку невыполненных задач")
+    filtering.add_argument("--sort", choices=SORT_KEYS, default="id", help="поле сортировки задач")
+    filtering.add_argument("--desc", action="store_true", help="сортировать по убыванию")
+    filtering.add_argument("--page", type=int, default=1)
+    filtering.add_argument("--page-size", type=int, help="число задач на странице (по умолчанию — все)")
+
+    report = commands.add_parser("report", help="финансовый отчёт за период")
+    report.add_argument("--from", dest="date_from", required=True)
+    report.add_argument("--to", dest="date_to", required=True)
+    report.add_argument("--csv", help="сохранить подробный отчёт в CSV-файл")
+
+    importing = commands.add_parser("import", help="импорт финансовых записей из CSV: файлы, папки или шаблоны")
+    importing.add_argument("paths", nargs="+")
+    importing.add_argument("--workers", type=int, help="число процессов для разбора файлов (по умолчанию — число ядер)")
+
+    search = commands.add_parser("search", help="поиск заметок или контактов")
+    search.add_argument("kind", choices=["notes", "contacts"])
+    search.add_argument("query")
+
+    batch = commands.add_parser("batch", help="применить операции из файла JSON Lines в одной транзакции")
+    batch.add_argument("file", nargs="?", default="-")
+
+    calc = commands.add_parser("calc", help="вычислить выражение или выражения из файла (по одному на строке)")
+    calc.add_argument("expression", nargs="?")
+    calc.add_argument("--file", help="файл с выражениями; - для стандартного ввода")
+    calc.add_argument("--finance", action="store_true",
+                      help="вычислить выражение для каждой финансовой записи, сумма доступна как amount")
+    calc.add_argument("--from", dest="date_from")
+    calc.add_argument("--to", dest="date_to")
+    calc.add_argument("--var", action="append", default=[], help="значение переменной: имя=число")
+
+    commands.add_parser("compact", help="переписать файлы данных в выбранном формате и очистить журналы")
+
+    serve = commands.add_parser("serve", help="запустить локальный HTTP/JSON-сервер")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--flush-interval", type=float, default=0.05, help="период записи изменений на диск, с")
+    return parser
+
+
+def parse_fields(pairs):
+    fields = {}
+    for pair in pairs:
+        key, separator, value = pair.partition("=")
+        if not separator:
+            raise ValueError(f"ожидается поле=значение, получено: {pair}")
+        fields[key] = value
+    return fields
+
+
+def task_filters(status=None, priority=None, due_date=None, date_from=None, date_to=None,
+                 sort="id", desc=False, page=1, page_size=None):
+    page, page_size = int(page), int(page_size) if page_size is not None else None
+    if page < 1 or (page_size is not None and page_size < 1):
+        raise ValueError("номер и размер страницы должны быть положительными.")
+    if due_date:
+        date_from = date_to = due_date
+    return {
+        "done": parse_done(status) if status is not None else None,
+        "priority": priority,
+        "due_from": date_from or None,
+        "due_to": date_to or None,
+        "sort_by": sort,
+        "descending": desc,
+        "offset": (page - 1) * page_size if page_size else 0,
+        "limit": page_size,
+    }
+
+
+def parse_done(value):
+    from tasks import DONE_VALUES
+
+    if isinstance(value, bool):
+        return value
+    done = DONE_VALUES.get(str(value).strip().lower())
+    if done is None:
+        raise ValueError(f"неверное значение статуса: {value}")
+    return done
+
+
+def print_items(items):
+    write_lines(json.dumps(item if isinstance(item, dict) else item.to_dict(), ensure_ascii=False) for item in items)
+
+
+def iter_items(manager, kind, after=None):
+    target = manager.get_manager(kind)
+    if kind == "finance":
+        return target.iter_records(after)
+    return after_cursor(sorted(getattr(target, ITEMS[kind]).values(), key=lambda item: item.id), after)
+
+
+def apply(manager, operation):
+    kind = operation.get("kind")
+    if kind not in MANAGERS:
+        raise ValueError(f"неизвестный тип записей: {kind}")
+    method = getattr(manager.get_manager(kind), OPERATIONS.get(operation.get("op"), ""), None)
+    if method is None:
+        raise ValueError(f"операция {operation.get('op')} не поддерживается для {kind}")
+    data = dict(operation.get("data", {}))
+    if kind == "tasks" and "done" in data:
+        data["done"] = parse_done(data["done"])
+    if operation["op"] == "add":
+        return method(**data)
+    return method(int(operation["id"]), **data)
+
+
+def run_batch(manager, lines):
+    operations = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            operations.append((number, json.loads(line)))
+        except json.JSONDecodeError as error:
+            raise ValueError(f"строка {number}: неверный JSON ({error.msg}).") from None
+
+    applied = 0
+    targets = [manager.get_manager(kind) for kind in sorted({operation.get("kind") for _, operation in operations
+                                                               if operation.get("kind") in MANAGERS})]
+    with ExitStack() as stack:
+        for target in targets:
+            stack.enter_context(target.batch())
+        for number, operation in operations:
+            try:
+                apply(manager, operation)
+            except (KeyError, TypeError, ValueError) as error:
+                raise ValueError(f"строка {number}: {error}") from None
+            applied += 1
+    return applied
+
+
+def configure(args):
+    if args.flush_delay is not None:
+        storage.FLUSH_DELAY = args.flush_delay
+    if args.format is not None:
+        storage.SNAPSHOT_FORMAT = args.format
+
+
+def run(args, manager=None):
+    configure(args)
+    manager = manager or MainManager(args.db)
+    try:
+        if args.command == "add":
+            fields = parse_fields(args.fields)
+            print_items([apply(manager, {"op": "add", "kind": args.kind, "data": fields})])
+        elif args.command == "list":
+            if args.limit is not None and args.limit < 1:
+                raise ValueError("--limit должен быть положительным.")
+            pager = Pager(iter_items(manager, args.kind, args.after), args.limit)
+            print_items(pager.next_page() if args.limit else pager.rest())
+            if pager.has_more:
+                print(f"Следующая страница: --after {pager.cursor}", file=sys.stderr)
+        elif args.command == "filter" and args.kind == "tasks":
+            tasks = manager.tasks_manager
+            if args.overdue:
+                print_items(tasks.overdue())
+            elif args.next is not None:
+                print_items(tasks.next_due(args.next))
+            else:
+                found, total = tasks.query(**task_filters(
+                    args.status, args.priority, args.due_date, args.date_from, args.date_to,
+                    args.sort, args.desc, args.page, args.page_size,
+                ))
+                print_items(found)
+                print(f"Найдено задач: {total}.", file=sys.stderr)
+        elif args.command == "filter":
+            finance = manager.finance_manager
+            if args.date_from or args.date_to:
+                if not (args.date_from and args.date_to):
+                    raise ValueError("нужно указать обе даты: --from и --to.")
+                print_items(finance.find_by_date(args.date_from, args.date_to))
+            elif args.category is not None:
+                print_items(finance.find_by_category(args.category))
+            else:
+                print_items(finance.records)
+        elif args.command == "report":
+            report = manager.finance_manager.report(args.date_from, args.date_to)
+            print(json.dumps({"from": args.date_from, "to": args.date_to, **report.to_dict()}, ensure_ascii=False))
+            if args.csv:
+                report.to_frame().to_csv(args.csv, index=False, encoding="utf-8")
+        elif args.command == "import":
+            file_names = [file_name for path in args.paths for file_name in find_csv_files(path)]
+            if not file_names:
+                raise ValueError("CSV-файлы не найдены.")
+            for file_name, imported, errors, error in manager.finance_manager.import_files(file_names, args.workers):
+                print(json.dumps({"file": file_name, "imported": imported, "errors": errors, "error": error}, ensure_ascii=False))
+        elif args.command == "search" and args.kind == "notes":
+            print_items(manager.notes_manager.search(args.query))
+        elif args.command == "search":
+            print_items(manager.contacts_manager.find(args.query))
+        elif args.command == "batch":
+            if args.file == "-":
+                applied = run_batch(manager, sys.stdin)
+            else:
+                with open(args.file, "r", encoding="utf-8") as file:
+                    applied = run_batch(manager, file)
+            print(f"Применено операций: {applied}.", file=sys.stderr)
+        elif args.command == "calc" and args.finance:
+            if args.expression is None:
+                raise ValueError("укажите выражение.")
+            variables = {}
+            for name, value in parse_fields(args.var).items():
+                try:
+                    variables[name] = float(value)
+                except ValueError:
+                    raise ValueError(f"значение переменной {name} должно быть числом.") from None
+            ids, values = manager.finance_manager.compute(args.expression, args.date_from, args.date_to, **variables)
+            for record_id, value in zip(ids.tolist(), values.tolist()):
+                print(json.dumps({"id": record_id, "result": value if math.isfinite(value) else None}))
+        elif args.command == "calc":
+            if args.file == "-":
+                results = manager.calculator.evaluate_many(sys.stdin)
+            elif args.file:
+                with open(args.file, "r", encoding="utf-8") as file:
+                    results = manager.calculator.evaluate_many(file)
+            elif args.expression is not None:
+                results = manager.calculator.evaluate_many([args.expression])
+            else:
+                raise ValueError("укажите выражение или --file.")
+            for expression, result, error in results:
+                print(json.dumps({"expression": expression, "result": result, "error": error}, ensure_ascii=False))
+        elif args.command == "compact":
+            for kind in MANAGERS:
+                target = manager.get_manager(kind)
+                target.storage.save(getattr(target, DUMPS[kind])())
+        elif args.command == "serve":
+            from server import serve
+
+            serve(manager, args.host, args.port, args.flush_interval)
+    except (OSError, RuntimeError, ValueError, sqlite3.Error) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+    manager.close()
+    return 0
+
+
+def main(argv=None):
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,8 @@
-import json
 import re
 
-import pandas as pd
+from csv_import import ImportReport, read_csv_chunks
+from search_index import PrefixTrie, TrigramIndex
+from storage import make_storage
 
 
 class Contact:
@@ -32,18 +33,33 @@ class Contact:
 class ContactsManager:
     def __init__(self, file_name="contacts.json"):
         self.file_name = file_name
+        self.storage = make_storage(file_name, "contacts", self.dump_contacts)
+        self.reload()
+
+    def reload(self):
         self.contacts = self.load_contacts()
+        self.name_index = TrigramIndex()
+        self.phone_index = PrefixTrie()
+        for contact in self.contacts.values():
+            self.index_contact(contact)
+
+    def index_contact(self, contact):
+        self.name_index.add(contact.id, contact.name)
+        self.phone_index.add(contact.id, contact.phone)
+
+    def unindex_contact(self, contact):
+        self.name_index.remove(contact.id)
+        self.phone_index.remove(contact.id)
 
     def load_contacts(self):
-        try:
-            with open(self.file_name, "r", encoding="utf-8") as file:
-                return [Contact.from_dict(contact) for contact in json.load(file)]
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        contacts = (Contact.from_dict(contact) for contact in self.storage.load())
+        return {contact.id: contact for contact in contacts}
 
     def save_contacts(self):
-        with open(self.file_name, "w", encoding="utf-8") as file:
-            json.dump([contact.to_dict() for contact in self.contacts], file, indent=4, ensure_ascii=False)
+        self.storage.save(self.dump_contacts())
+
+    def dump_contacts(self):
+        return [contact.to_dict() for contact in self.contacts.values()]
 
     @staticmethod
     def validate_phone(phone):
@@ -53,8 +69,65 @@ class ContactsManager:
             return True
         return False
 
+    def batch(self):
+        return self.storage.batch()
+
+    def refresh(self):
+        reload, entries = self.storage.poll()
+        if reload:
+            self.reload()
+        for entry in entries:
+            item_id = entry["id"] if entry["op"] == "delete" else entry["item"]["id"]
+            if item_id in self.contacts:
+                self.unindex_contact(self.contacts.pop(item_id))
+            if entry["op"] != "delete":
+                contact = Contact.from_dict(entry["item"])
+                self.contacts[contact.id] = contact
+                self.index_contact(contact)
+
+    def insert(self, name, phone="", email=""):
+        name, phone, email = name.strip(), phone.strip(), email.strip()
+        if not name:
+            raise ValueError("имя контакта не может быть пустым.")
+        if not self.validate_phone(phone):
+            raise ValueError("номер телефона должен содержать только цифры и может начинаться с +.")
+        contact = Contact(self.storage.allocate_id(), name, phone, email)
+        self.contacts[contact.id] = contact
+        self.index_contact(contact)
+        self.storage.create(contact.to_dict())
+        return contact
+
+    def update(self, contact_id, name=None, phone=None, email=None):
+        contact = self.contacts.get(contact_id)
+        if contact is None:
+            raise ValueError("контакт с таким ID не найден.")
+        if phone and not self.validate_phone(phone):
+            raise ValueError("номер телефона должен содержать только цифры и может начинаться с +.")
+        self.unindex_contact(contact)
+        if name:
+            contact.name = name
+        if phone:
+            contact.phone = phone
+        if email:
+            contact.email = email
+        self.index_contact(contact)
+        self.storage.update(contact.to_dict())
+        return contact
+
+    def remove(self, contact_id):
+        if contact_id not in self.contacts:
+            raise ValueError("контакт с таким ID не найден.")
+        self.unindex_contact(self.contacts.pop(contact_id))
+        self.storage.delete(contact_id)
+
+    def find(self, query):
+        query = query.strip().lower()
+        found = self.name_index.search(query)
+        if query.lstrip("+").isdigit():
+            found |= self.phone_index.search(query) or self.phone_index.contains(query)
+        return [self.contacts[contact_id] for contact_id in sorted(found)]
+
     def add_contact(self):
-        contact_id = max([contact.id for contact in self.contacts], default=0) + 1
         name = input("Введите имя контакта: ").strip()
         if not name:
             print("Ошибка: имя контакта не может быть пустым.")
@@ -64,14 +137,12 @@ class ContactsManager:
             print("Ошибка: номер телефона должен содержать только цифры и может начинаться с +.")
             return
         email = input("Введите адрес электронной почты (или оставьте пустым): ").strip()
-        new_contact = Contact(contact_id, name, phone, email)
-        self.contacts.append(new_contact)
-        self.save_contacts()
-        print(f"Контакт с ID {contact_id} успешно добавлен.")
+        new_contact = self.insert(name, phone, email)
+        print(f"Контакт с ID {new_contact.id} успешно добавлен.")
 
     def search_contacts(self):
-        query = input("Введите имя или номер телефона для поиска: ").strip().lower()
-        results = [contact for contact in self.contacts if query in contact.name.lower() or query in contact.phone]
+        query = input("Введите имя или номер телефона для поиска: ")
+        results = self.find(query)
         if results:
             print("Найденные контакты:")
             for contact in results:
@@ -85,24 +156,16 @@ class ContactsManager:
         except ValueError:
             print("Ошибка: ID должен быть числом.")
             return
-        contact = next((contact for contact in self.contacts if contact.id == contact_id), None)
+        contact = self.contacts.get(contact_id)
         if contact:
             new_name = input(f"Введите новое имя ({contact.name}): ").strip()
             new_phone = input(f"Введите новый номер телефона ({contact.phone}): ").strip()
             new_email = input(f"Введите новый адрес электронной почты ({contact.email}): ").strip()
-            if new_phone and not self.validate_phone(new_phone):
-                print("Ошибка: номер телефона должен содержать только цифры и может начинаться с +.")
-                return
-
-            if new_name:
-                contact.name = new_name
-            if new_phone:
-                contact.phone = new_phone
-            if new_email:
-                contact.email = new_email
-
-            self.save_contacts()
-            print(f"Контакт с ID {contact_id} успешно обновлён.")
+            try:
+                self.update(contact_id, new_name, new_phone, new_email)
+                print(f"Контакт с ID {contact_id} успешно обновлён.")
+            except ValueError as e:
+                print(f"Ошибка: {e}")
         else:
             print("Ошибка: контакт с таким ID не найден.")
 
@@ -112,12 +175,11 @@ class ContactsManager:
         except ValueError:
             print("Ошибка: ID должен быть числом.")
             return
-        if any(contact.id == contact_id for contact in self.contacts):
-            self.contacts = [contact for contact in self.contacts if contact.id != contact_id]
-            self.save_contacts()
+        try:
+            self.remove(contact_id)
             print(f"Контакт с ID {contact_id} успешно удалён.")
-        else:
-            print("Ошибка: контакт с таким ID не найден.")
+        except ValueError as e:
+            print(f"Ошибка: {e}")
 
     def export_contacts_to_csv(self):
         if not self.contacts:
@@ -127,8 +189,10 @@ class ContactsManager:
         if not file_name.endswith(".csv"):
             print("Ошибка: имя файла должно заканчиваться на .csv.")
             return
+        import pandas as pd
+
         try:
-            df = pd.DataFrame([contact.to_dict() for contact in self.contacts])
+            df = pd.DataFrame(self.dump_contacts())
             df.to_csv(file_name, index=False, encoding="utf-8")
             print(f"Контакты успешно экспортированы в файл {file_name}.")
         except Exception as e:
@@ -136,25 +200,44 @@ class ContactsManager:
 
     def import_contacts_from_csv(self):
         file_name = input("Введите имя файла для импорта (например, contacts.csv): ").strip()
+        import pandas as pd
+
         try:
-            df = pd.read_csv(file_name, encoding="utf-8")
-            if not {"name", "phone", "email"}.issubset(df.columns):
-                print("Ошибка: некорректный формат файла.")
-                return
-            max_id = max([contact.id for contact in self.contacts], default=0)
-            for _, row in df.iterrows():
-                max_id += 1
-                self.contacts.append(Contact(
-                    contact_id=max_id,
-                    name=row["name"],
-                    phone=row.get("phone", ""),
-                    email=row.get("email", "")
-                ))
-            self.save_contacts()
+            report = ImportReport()
+            for chunk in read_csv_chunks(file_name):
+                if not {"name", "phone", "email"}.issubset(chunk.columns):
+                    print("Ошибка: некорректный формат файла.")
+                    return
+                names = chunk["name"].str.strip()
+                phones = chunk["phone"].str.strip()
+                bad_name = names == ""
+                bad_phone = ~bad_name & (phones != "") & ~phones.str.fullmatch(r"\+?\d+")
+                report.reject(chunk, bad_name, "пустое имя контакта")
+                report.reject(chunk, bad_phone, "некорректный номер телефона")
+
+                valid = ~(bad_name | bad_phone)
+                count = int(valid.sum())
+                if not count:
+                    continue
+                new_contacts = [
+                    Contact(contact_id, name, phone, email)
+                    for contact_id, name, phone, email in zip(
+                        self.storage.allocate_ids(count),
+                        names[valid].tolist(),
+                        phones[valid].tolist(),
+                        chunk["email"][valid].str.strip().tolist(),
+                    )
+                ]
+                for contact in new_contacts:
+                    self.contacts[contact.id] = contact
+                    self.index_contact(contact)
+                self.storage.create_many([contact.to_dict() for contact in new_contacts])
+                report.imported += count
+            report.summary()
             print(f"Контакты успешно импортированы из файла {file_name}.")
         except FileNotFoundError:
             print("Ошибка: файл не найден.")
         except pd.errors.EmptyDataError:
             print("Ошибка: файл пустой.")
         except Exception as e:
-            print(f"Ошибка при импорте: {e}")
\ No newline at end of file
+            print(f"Ошибка при импорте: {e}")
@@ -0,0 +1,68 @@
+import glob
+import os
+
+
+CHUNK_SIZE = 50_000
+MAX_PRINTED_ERRORS = 20
+ERRORS_SUFFIX = ".errors.csv"
+
+
+def read_csv_chunks(file_name, chunk_size=CHUNK_SIZE):
+    import pandas as pd
+
+    first_row = 1
+    for chunk in pd.read_csv(file_name, encoding="utf-8", dtype=str, keep_default_na=False, chunksize=chunk_size):
+        chunk.index = pd.RangeIndex(first_row, first_row + len(chunk))
+        first_row += len(chunk)
+        yield chunk
+
+
+def find_csv_files(pattern):
+    if os.path.isdir(pattern):
+        file_names = glob.glob(os.path.join(pattern, "*.csv"))
+    elif glob.has_magic(pattern):
+        file_names = filter(os.path.isfile, glob.glob(pattern))
+    else:
+        return [pattern]
+    return sorted(file_name for file_name in file_names if not file_name.endswith(ERRORS_SUFFIX))
+
+
+def parse_dates(dates):
+    import pandas as pd
+
+    import finance_store
+
+    return pd.Series(finance_store.parse_dates(dates.to_numpy()), index=dates.index)
+
+
+class ImportReport:
+    def __init__(self, error_file_name=None):
+        self.imported = 0
+        self.errors = 0
+        self.error_file_name = error_file_name
+        self.error_file_started = False
+        if error_file_name and os.path.exists(error_file_name):
+            os.remove(error_file_name)
+
+    def error(self, row, message):
+        self.errors += 1
+        if self.errors <= MAX_PRINTED_ERRORS:
+            print(f"Ошибка в строке {row}: {message}")
+
+    def reject(self, chunk, mask, message):
+        for row in chunk.index[mask]:
+            self.error(row, message)
+
+    def write_rejected(self, rejected):
+        if self.error_file_name is None or rejected.empty:
+            return
+        rejected.to_csv(self.error_file_name, mode="a" if self.error_file_started else "w",
+                        header=not self.error_file_started, index_label="row", encoding="utf-8")
+        self.error_file_started = True
+
+    def summary(self):
+        if self.errors > MAX_PRINTED_ERRORS:
+            print(f"... и ещё {self.errors - MAX_PRINTED_ERRORS} строк с ошибками.")
+        print(f"Импортировано записей: {self.imported}, пропущено строк с ошибками: {self.errors}.")
+        if self.error_file_started:
+            print(f"Строки с ошибками сохранены в файл {self.error_file_name}.")
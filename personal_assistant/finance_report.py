@@ -0,0 +1,82 @@
+import numpy as np
+
+
+class FinanceReport:
+    def __init__(self, store, date_from, date_to, rollups=None):
+        self.store = store
+        self.date_from, self.date_to = date_from, date_to
+        self.positions = None
+        if rollups is None:
+            self.scan(store)
+        else:
+            self.summarize(rollups)
+
+    def summarize(self, rollups):
+        by_category, by_month = rollups.summarize(self.date_from, self.date_to)
+        self.count = sum(count for _, _, count in by_category.values())
+        self.income = sum(income for income, _, _ in by_category.values())
+        self.expense = sum(expense for _, expense, _ in by_category.values())
+        self.balance = self.income + self.expense
+        order = self.store.category_index
+        self.by_category = [
+            (category, income, expense)
+            for category, (income, expense, count) in sorted(by_category.items(), key=lambda item: order.get(item[0], len(order)))
+            if count
+        ]
+        self.by_month = [
+            (np.datetime64(month, "M").item().strftime("%m-%Y"), income, expense)
+            for month, (income, expense, count) in sorted(by_month.items())
+            if count
+        ]
+
+    def scan(self, store):
+        self.positions = store.date_range(self.date_from, self.date_to)
+        amounts = store.amounts[self.positions]
+        income = np.where(amounts > 0, amounts, 0.0)
+        expense = np.where(amounts < 0, amounts, 0.0)
+
+        self.count = len(self.positions)
+        self.income = float(income.sum())
+        self.expense = float(expense.sum())
+        self.balance = self.income + self.expense
+
+        codes = store.category_codes[self.positions]
+        category_count = len(store.categories)
+        category_income = np.bincount(codes, weights=income, minlength=category_count)
+        category_expense = np.bincount(codes, weights=expense, minlength=category_count)
+        self.by_category = [
+            (store.categories[code], float(category_income[code]), float(category_expense[code]))
+            for code in np.flatnonzero(np.bincount(codes, minlength=category_count))
+        ]
+
+        months, month_codes = np.unique(store.dates[self.positions].astype("datetime64[M]"), return_inverse=True)
+        month_income = np.bincount(month_codes, weights=income, minlength=len(months))
+        month_expense = np.bincount(month_codes, weights=expense, minlength=len(months))
+        self.by_month = [
+            (month.item().strftime("%m-%Y"), float(month_income[i]), float(month_expense[i]))
+            for i, month in enumerate(months)
+        ]
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "income": self.income,
+            "expense": self.expense,
+            "balance": self.balance,
+            "by_category": self.by_category,
+            "by_month": self.by_month,
+        }
+
+    def to_frame(self):
+        import pandas as pd
+
+        if self.positions is None:
+            self.positions = self.store.date_range(self.date_from, self.date_to)
+
+        return pd.DataFrame({
+            "id": self.store.ids[self.positions],
+            "amount": self.store.amounts[self.positions],
+            "category": np.array(self.store.categories, dtype=object)[self.store.category_codes[self.positions]],
+            "date": pd.Series(self.store.dates[self.positions]).dt.strftime("%d-%m-%Y"),
+            "description": [self.store.descriptions[position] for position in self.positions.tolist()],
+        })
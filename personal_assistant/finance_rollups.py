@@ -0,0 +1,114 @@
+import numpy as np
+
+from serialization import dumps, loads
+from storage import write_atomic
+
+
+def day_number(date):
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+def month_number(day):
+    return int(np.datetime64(day, "D").astype("datetime64[M]").astype(np.int64))
+
+
+def month_first_day(month):
+    return int(np.datetime64(month, "M").astype("datetime64[D]").astype(np.int64))
+
+
+def accumulate(table, key, income, expense, count):
+    totals = table.setdefault(key, [0.0, 0.0, 0])
+    totals[0] += income
+    totals[1] += expense
+    totals[2] += count
+
+
+def add_totals(table, key, category, income, expense, count):
+    accumulate(table.setdefault(key, {}), category, income, expense, count)
+
+
+class FinanceRollups:
+    def __init__(self):
+        self.days = {}
+        self.months = {}
+        self.dirty = False
+
+    @staticmethod
+    def from_store(store):
+        rollups = FinanceRollups()
+        rollups.add_rows(store, 0, len(store))
+        return rollups
+
+    def add_rows(self, store, start, stop):
+        if stop <= start:
+            return
+        dates = store.dates[start:stop]
+        valid = ~np.isnat(dates)
+        days = dates[valid].astype(np.int64)
+        codes = store.category_codes[start:stop][valid].astype(np.int64)
+        amounts = store.amounts[start:stop][valid]
+        category_count = max(len(store.categories), 1)
+        keys, inverse = np.unique(days * category_count + codes, return_inverse=True)
+        income = np.bincount(inverse, weights=np.where(amounts > 0, amounts, 0.0), minlength=len(keys))
+        expense = np.bincount(inverse, weights=np.where(amounts < 0, amounts, 0.0), minlength=len(keys))
+        counts = np.bincount(inverse, minlength=len(keys))
+        key_days, key_codes = np.divmod(keys, category_count)
+        key_months = key_days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        for day, month, code, day_income, day_expense, count in zip(
+            key_days.tolist(), key_months.tolist(), key_codes.tolist(), income.tolist(), expense.tolist(), counts.tolist()
+        ):
+            category = store.categories[code]
+            add_totals(self.days, day, category, day_income, day_expense, count)
+            add_totals(self.months, month, category, day_income, day_expense, count)
+        self.dirty = True
+
+    def summarize(self, date_from, date_to):
+        first_day, last_day = day_number(date_from), day_number(date_to)
+        by_category, by_month = {}, {}
+        if first_day > last_day:
+            return by_category, by_month
+        first_month, last_month = month_number(first_day), month_number(last_day)
+        full_from = first_month if month_first_day(first_month) == first_day else first_month + 1
+        full_to = last_month if month_first_day(last_month + 1) == last_day + 1 else last_month - 1
+        if full_from > full_to:
+            spans = [(first_day, last_day)]
+        else:
+            spans = [(first_day, month_first_day(full_from) - 1), (month_first_day(full_to + 1), last_day)]
+            for month in range(full_from, full_to + 1):
+                self.collect(self.months.get(month), month, by_category, by_month)
+        for start, stop in spans:
+            for day in range(start, stop + 1):
+                self.collect(self.days.get(day), month_number(day), by_category, by_month)
+        return by_category, by_month
+
+    @staticmethod
+    def collect(totals, month, by_category, by_month):
+        if not totals:
+            return
+        for category, (income, expense, count) in totals.items():
+            accumulate(by_category, category, income, expense, count)
+            accumulate(by_month, month, income, expense, count)
+
+    def save(self, file_name, fingerprint):
+        rows = [
+            [day, category, income, expense, count]
+            for day, totals in self.days.items()
+            for category, (income, expense, count) in totals.items()
+        ]
+        write_atomic(file_name, dumps({"fingerprint": fingerprint, "days": rows}))
+        self.dirty = False
+
+    @staticmethod
+    def load(file_name, fingerprint):
+        try:
+            with open(file_name, "rb") as file:
+                data = loads(file.read())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("fingerprint") != fingerprint:
+            return None
+        rollups = FinanceRollups()
+        for day, category, income, expense, count in data["days"]:
+            add_totals(rollups.days, day, category, income, expense, count)
+            add_totals(rollups.months, month_number(day), category, income, expense, count)
+        return rollups
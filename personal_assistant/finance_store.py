@@ -0,0 +1,358 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+
+DIGIT_POSITIONS = [0, 1, 3, 4, 6, 7, 8, 9]
+COLUMNS = {
+    "ids": "<i8",
+    "amounts": "<f8",
+    "dates": "<M8[D]",
+    "category_codes": "<i4",
+}
+
+
+def parse_date(date):
+    try:
+        return np.datetime64(datetime.strptime(date, "%d-%m-%Y").date(), "D")
+    except (TypeError, ValueError):
+        return np.datetime64("NaT", "D")
+
+
+def parse_dates(dates):
+    dates = np.asarray(dates).astype("U")
+    result = np.full(len(dates), np.datetime64("NaT"), dtype="datetime64[D]")
+    if not len(dates):
+        return result
+    fixed = np.char.str_len(dates) == 10
+    chars = dates[fixed].astype("U10").view(np.uint32).reshape(-1, 10).astype(np.int64) - ord("0")
+    ok = np.all((chars[:, DIGIT_POSITIONS] >= 0) & (chars[:, DIGIT_POSITIONS] <= 9), axis=1)
+    ok &= (chars[:, 2] == ord("-") - ord("0")) & (chars[:, 5] == ord("-") - ord("0"))
+    day = chars[:, 0] * 10 + chars[:, 1]
+    month = chars[:, 3] * 10 + chars[:, 4]
+    year = chars[:, 6] * 1000 + chars[:, 7] * 100 + chars[:, 8] * 10 + chars[:, 9]
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (year >= 1)
+    month_start = np.where(ok, (year - 1970) * 12 + month - 1, 0).astype("datetime64[M]")
+    first_day = month_start.astype("datetime64[D]")
+    ok &= day <= ((month_start + 1).astype("datetime64[D]") - first_day).astype(np.int64)
+    result[np.flatnonzero(fixed)[ok]] = first_day[ok] + (day[ok] - 1)
+    for position in np.flatnonzero(~fixed):
+        result[position] = parse_date(str(dates[position]))
+    return result
+
+
+def column_map(file_name, dtype, length):
+    if not length:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(file_name, dtype=dtype, mode="c", shape=(length,))
+
+
+def write_column(file_name, values, capacity=None):
+    with open(file_name, "wb") as file:
+        values.tofile(file)
+        if capacity is not None:
+            file.truncate(capacity * values.itemsize)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+class StringHeap:
+    def __init__(self, offsets=None, heap=None):
+        self.offsets = offsets
+        self.heap = heap
+        self.base = 0 if offsets is None else len(offsets) - 1
+        self.tail = []
+
+    def __len__(self):
+        return self.base + len(self.tail)
+
+    def __getitem__(self, position):
+        if position < self.base:
+            return self.heap[self.offsets[position]:self.offsets[position + 1]].tobytes().decode("utf-8")
+        return self.tail[position - self.base]
+
+    def extend(self, values):
+        self.tail.extend(values)
+
+    def copy(self):
+        heap = StringHeap(self.offsets, self.heap)
+        heap.tail = list(self.tail)
+        return heap
+
+    def write(self, offsets_name, heap_name, size):
+        base = min(self.base, size)
+        tail = [value.encode("utf-8") for value in self.tail[:size - base]]
+        base_size = int(self.offsets[base]) if base else 0
+        offsets = np.empty(size + 1, dtype="<i8")
+        offsets[:base + 1] = self.offsets[:base + 1] if base else 0
+        np.cumsum([len(value) for value in tail], out=offsets[base + 1:])
+        offsets[base + 1:] += base_size
+        write_column(offsets_name, offsets)
+        with open(heap_name, "wb") as file:
+            if base_size:
+                self.heap[:base_size].tofile(file)
+            file.write(b"".join(tail))
+            file.flush()
+            os.fsync(file.fileno())
+        return int(offsets[-1])
+
+
+class FinanceRecord:
+    __slots__ = ("id", "amount", "category", "date", "description")
+
+    def __init__(self, record_id, amount, category, date, description=""):
+        self.id = record_id
+        self.amount = amount
+        self.category = category
+        self.date = date
+        self.description = description
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "amount": self.amount,
+            "category": self.category,
+            "date": self.date,
+            "description": self.description,
+        }
+
+    @staticmethod
+    def from_dict(data):
+        return FinanceRecord(
+            record_id=data["id"],
+            amount=data["amount"],
+            category=data["category"],
+            date=data["date"],
+            description=data.get("description", ""),
+        )
+
+
+class FinanceStore:
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.amounts = np.empty(capacity, dtype=np.float64)
+        self.dates = np.empty(capacity, dtype="datetime64[D]")
+        self.category_codes = np.empty(capacity, dtype=np.int32)
+        self.categories = []
+        self.category_index = {}
+        self.descriptions = StringHeap()
+        self.raw_dates = {}
+        self.date_order = None
+        self.sorted_dates = None
+        self.indexed = 0
+
+    @staticmethod
+    def from_dicts(items):
+        items = sorted(items, key=lambda item: item["id"])
+        store = FinanceStore(max(len(items), 1024))
+        store.extend_items(items)
+        return store
+
+    @staticmethod
+    def column_file(directory, name, generation):
+        return os.path.join(directory, f"{name}-{generation}.col")
+
+    @staticmethod
+    def open_columns(directory):
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        count, generation = meta["count"], meta["generation"]
+        store = FinanceStore(1)
+        for name, dtype in COLUMNS.items():
+            setattr(store, name, column_map(FinanceStore.column_file(directory, name, generation), dtype, meta["capacity"]))
+        store.size = count
+        store.categories = meta["categories"]
+        store.category_index = {category: code for code, category in enumerate(store.categories)}
+        store.raw_dates = {int(record_id): date for record_id, date in meta.get("raw_dates", {}).items()}
+        store.descriptions = StringHeap(
+            column_map(FinanceStore.column_file(directory, "offsets", generation), "<i8", count + 1),
+            column_map(FinanceStore.column_file(directory, "heap", generation), "u1", meta["heap_size"]),
+        )
+        store.date_order = column_map(FinanceStore.column_file(directory, "date_order", generation), "<i8", count)
+        store.sorted_dates = column_map(FinanceStore.column_file(directory, "sorted_dates", generation), "<M8[D]", count)
+        store.indexed = count
+        return store, meta
+
+    def write_columns(self, directory, generation):
+        os.makedirs(directory, exist_ok=True)
+        capacity = max(self.size + self.size // 8, 1024)
+        for name in COLUMNS:
+            write_column(self.column_file(directory, name, generation), getattr(self, name)[:self.size], capacity)
+        if self.indexed < self.size:
+            self.date_order = None
+        order, dates = self.date_index()
+        write_column(self.column_file(directory, "date_order", generation), order)
+        write_column(self.column_file(directory, "sorted_dates", generation), dates)
+        heap_size = self.descriptions.write(
+            self.column_file(directory, "offsets", generation),
+            self.column_file(directory, "heap", generation),
+            self.size,
+        )
+        return {
+            "generation": generation,
+            "count": self.size,
+            "capacity": capacity,
+            "heap_size": heap_size,
+            "categories": self.categories,
+            "raw_dates": {str(record_id): date for record_id, date in self.raw_dates.items()},
+        }
+
+    def view(self):
+        store = FinanceStore(1)
+        for name in COLUMNS:
+            setattr(store, name, getattr(self, name)[:self.size])
+        store.size = self.size
+        store.categories = list(self.categories)
+        store.category_index = dict(self.category_index)
+        store.descriptions = self.descriptions.copy()
+        store.raw_dates = dict(self.raw_dates)
+        store.date_order, store.sorted_dates, store.indexed = self.date_order, self.sorted_dates, self.indexed
+        return store
+
+    def apply_entries(self, entries):
+        items = [entry["item"] for entry in entries if entry["op"] == "create"]
+        ids = [item["id"] for item in items]
+        last_id = self.ids[self.size - 1] if self.size else 0
+        if len(items) == len(entries) and all(a < b for a, b in zip([last_id] + ids, ids)):
+            self.extend_items(items)
+            return self
+        records = {record["id"]: record for record in self.to_dicts()}
+        for entry in entries:
+            if entry["op"] == "delete":
+                records.pop(entry["id"], None)
+            else:
+                records[entry["item"]["id"]] = entry["item"]
+        return FinanceStore.from_dicts(list(records.values()))
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return self.iter_rows(0, self.size)
+
+    def __contains__(self, record_id):
+        return self.position(record_id) is not None
+
+    def position(self, record_id):
+        position = int(np.searchsorted(self.ids[:self.size], record_id))
+        if position < self.size and self.ids[position] == record_id:
+            return position
+        return None
+
+    def get(self, record_id):
+        position = self.position(record_id)
+        if position is None:
+            return None
+        return next(self.iter_rows(position, position + 1))
+
+    def iter_rows(self, start, stop, chunk_size=4096):
+        for chunk_start in range(start, stop, chunk_size):
+            chunk_stop = min(chunk_start + chunk_size, stop)
+            yield from self.rows(range(chunk_start, chunk_stop))
+
+    def iter_positions(self, positions, chunk_size=4096):
+        positions = np.asarray(positions, dtype=np.int64)
+        for start in range(0, len(positions), chunk_size):
+            yield from self.rows(positions[start:start + chunk_size])
+
+    def rows(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        ids = self.ids[positions].tolist()
+        amounts = self.amounts[positions].tolist()
+        dates = self.dates[positions].tolist()
+        codes = self.category_codes[positions].tolist()
+        for i, position in enumerate(positions.tolist()):
+            yield FinanceRecord(
+                ids[i],
+                amounts[i],
+                self.categories[codes[i]],
+                dates[i].strftime("%d-%m-%Y") if dates[i] is not None else self.raw_dates.get(ids[i], ""),
+                self.descriptions[position],
+            )
+
+    def matching_categories(self, query):
+        query = query.lower()
+        return [category for category in self.categories if query in category.lower()]
+
+    def category_positions(self, query):
+        codes = [self.category_index[category] for category in self.matching_categories(query)]
+        return np.flatnonzero(np.isin(self.category_codes[:self.size], codes))
+
+    def iter_category(self, query):
+        return self.iter_positions(self.category_positions(query))
+
+    def date_index(self):
+        if self.date_order is None or self.size - self.indexed > max(4096, self.indexed // 8):
+            self.date_order = np.argsort(self.dates[:self.size], kind="stable")
+            self.sorted_dates = self.dates[:self.size][self.date_order]
+            self.indexed = self.size
+        return self.date_order, self.sorted_dates
+
+    def date_range(self, date_from, date_to):
+        order, dates = self.date_index()
+        date_from, date_to = np.datetime64(date_from, "D"), np.datetime64(date_to, "D")
+        start = np.searchsorted(dates, date_from, side="left")
+        stop = np.searchsorted(dates, date_to, side="right")
+        positions = np.asarray(order[start:stop])
+        if self.indexed < self.size:
+            tail = self.dates[self.indexed:self.size]
+            extra = np.flatnonzero((tail >= date_from) & (tail <= date_to)) + self.indexed
+            if len(extra):
+                positions = np.concatenate([positions, extra])
+                positions = positions[np.argsort(self.dates[positions], kind="stable")]
+        return positions
+
+    def category_code(self, category):
+        code = self.category_index.get(category)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(category)
+            self.category_index[category] = code
+        return code
+
+    def reserve(self, count):
+        needed = self.size + count
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        capacity = max(capacity, 1024)
+        while capacity < needed:
+            capacity *= 2
+        for name in ("ids", "amounts", "dates", "category_codes"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def append(self, record):
+        self.extend_items([record.to_dict()])
+
+    def extend_items(self, items):
+        dates = [item["date"] for item in items]
+        parsed = parse_dates(dates)
+        self.extend(
+            [item["id"] for item in items],
+            [item["amount"] for item in items],
+            [item["category"] for item in items],
+            parsed,
+            [item.get("description", "") for item in items],
+        )
+        for position in np.flatnonzero(np.isnat(parsed)).tolist():
+            self.raw_dates[items[position]["id"]] = dates[position]
+
+    def extend(self, ids, amounts, categories, dates, descriptions):
+        count = len(ids)
+        self.reserve(count)
+        start, stop = self.size, self.size + count
+        self.ids[start:stop] = ids
+        self.amounts[start:stop] = amounts
+        self.dates[start:stop] = dates
+        self.category_codes[start:stop] = [self.category_code(category) for category in categories]
+        self.descriptions.extend(descriptions)
+        self.size = stop
+
+    def to_dicts(self):
+        return [record.to_dict() for record in self]
@@ -1,131 +1,264 @@
-import json
-import pandas as pd
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from calculator import evaluate_columns
+from csv_import import ERRORS_SUFFIX, ImportReport, find_csv_files, read_csv_chunks
+from finance_report import FinanceReport
+from finance_rollups import FinanceRollups
+from finance_store import FinanceRecord, FinanceStore, parse_dates
+from paging import show_pages
+from storage import make_storage
 
-class FinanceRecord:
-    def __init__(self, record_id, amount, category, date, description=""):
-        self.id = record_id
-        self.amount = amount
-        self.category = category
-        self.date = date
-        self.description = description
+REQUIRED_COLUMNS = {"amount", "category", "date"}
+QUERY_PAGE_SIZE = 1000
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "amount": self.amount,
-            "category": self.category,
-            "date": self.date,
-            "description": self.description,
-        }
 
-    @staticmethod
-    def from_dict(data):
-        return FinanceRecord(
-            record_id=data["id"],
-            amount=data["amount"],
-            category=data["category"],
-            date=data["date"],
-            description=data.get("description", ""),
-        )
+def parse_csv_file(file_name):
+    import pandas as pd
+
+    clean, rejected = [], []
+    try:
+        for chunk in read_csv_chunks(file_name):
+            if not REQUIRED_COLUMNS.issubset(chunk.columns):
+                return file_name, None, None, "некорректный формат файла."
+            chunk_clean, chunk_rejected = FinanceManager.validate_chunk(chunk)
+            clean.append(chunk_clean)
+            rejected.append(chunk_rejected)
+    except FileNotFoundError:
+        return file_name, None, None, "файл не найден."
+    except pd.errors.EmptyDataError:
+        return file_name, None, None, "файл пустой."
+    except Exception as e:
+        return file_name, None, None, str(e)
+    if not clean:
+        return file_name, None, None, "файл пустой."
+    return file_name, pd.concat(clean), pd.concat(rejected), None
 
 
 class FinanceManager:
     def __init__(self, file_name="finance.json"):
         self.file_name = file_name
-        self.records = self.load_records()
+        self.storage = make_storage(file_name, "finance", self.snapshot_records)
+        self.rollups_file_name = file_name + ".rollup"
+        self.store = None if self.storage.supports_queries else self.load_records()
+        self.rollups = None
+
+    @property
+    def records(self):
+        if self.store is None:
+            self.store = self.load_records()
+        return self.store
+
+    @records.setter
+    def records(self, store):
+        self.store = store
 
     def load_records(self):
-        try:
-            with open(self.file_name, "r", encoding="utf-8") as file:
-                return [FinanceRecord.from_dict(record) for record in json.load(file)]
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        if self.storage.columnar:
+            return self.storage.load_store()
+        return FinanceStore.from_dicts(self.storage.load())
+
+    def fingerprint(self):
+        last_id = int(self.records.ids[len(self.records) - 1]) if len(self.records) else 0
+        return f"{len(self.records)}-{last_id}"
+
+    def get_rollups(self):
+        if self.rollups is None:
+            self.rollups = FinanceRollups.load(self.rollups_file_name, self.fingerprint())
+        if self.rollups is None:
+            self.rollups = FinanceRollups.from_store(self.records)
+        return self.rollups
+
+    def update_rollups(self, start):
+        if self.rollups is not None:
+            self.rollups.add_rows(self.records, start, len(self.records))
+
+    def save_rollups(self):
+        if self.rollups is not None and self.rollups.dirty:
+            self.rollups.save(self.rollups_file_name, self.fingerprint())
+
+    def snapshot_records(self):
+        if self.storage.columnar:
+            return self.records.view()
+        return self.dump_records()
 
     def save_records(self):
-        with open(self.file_name, "w", encoding="utf-8") as file:
-            json.dump([record.to_dict() for record in self.records], file, indent=4, ensure_ascii=False)
+        self.storage.save(self.dump_records())
+
+    def dump_records(self):
+        return self.records.to_dicts()
+
+    def query_records(self, where, params, limit=None):
+        return [FinanceRecord.from_dict(record) for record in self.storage.find(where, params, limit=limit)]
+
+    def batch(self):
+        return self.storage.batch()
+
+    def refresh(self):
+        reload, entries = self.storage.poll()
+        if reload:
+            self.store = None if self.storage.supports_queries else self.load_records()
+            self.rollups = None
+        elif entries and self.store is not None:
+            records, start = self.records, len(self.records)
+            self.records = records.apply_entries(entries)
+            if self.records is records:
+                self.update_rollups(start)
+            else:
+                self.rollups = None
+
+    @staticmethod
+    def parse_date(date):
+        try:
+            return datetime.strptime(date, "%d-%m-%Y")
+        except ValueError:
+            raise ValueError("неверный формат даты.") from None
+
+    def insert(self, amount, category, date, description=""):
+        try:
+            amount = float(amount)
+        except (TypeError, ValueError):
+            amount = math.nan
+        if not math.isfinite(amount):
+            raise ValueError("сумма должна быть числом.")
+        date = date.strip()
+        self.parse_date(date)
+        record = FinanceRecord(self.storage.allocate_id(), amount, category.strip(), date, description.strip())
+        if self.store is not None:
+            start = len(self.store)
+            self.store.append(record)
+            self.update_rollups(start)
+        self.storage.create(record.to_dict())
+        return record
+
+    def iter_records(self, after=None):
+        if self.storage.supports_queries:
+            return self.iter_query(after or 0)
+        start = 0
+        if after is not None:
+            start = int(np.searchsorted(self.records.ids[:len(self.records)], after, side="right"))
+        return self.records.iter_rows(start, len(self.records))
+
+    def iter_query(self, after, page_size=QUERY_PAGE_SIZE):
+        while True:
+            records = self.query_records("id > ?", (after,), limit=page_size)
+            yield from records
+            if len(records) < page_size:
+                return
+            after = records[-1].id
+
+    def stream_by_date(self, date_from, date_to):
+        date_from, date_to = self.parse_date(date_from), self.parse_date(date_to)
+        if self.storage.supports_queries:
+            records = self.query_records("day BETWEEN ? AND ?", (date_from.strftime("%Y-%m-%d"), date_to.strftime("%Y-%m-%d")))
+            return iter(records), len(records)
+        positions = self.records.date_range(date_from, date_to)
+        return self.records.iter_positions(positions), len(positions)
+
+    def stream_by_category(self, category):
+        if self.storage.supports_queries:
+            query = category.lower()
+            categories = [name for name in self.storage.distinct("category") if query in name.lower()]
+            placeholders = ", ".join("?" for _ in categories)
+            records = self.query_records(f"category IN ({placeholders})", categories) if categories else []
+            return iter(records), len(records)
+        positions = self.records.category_positions(category)
+        return self.records.iter_positions(positions), len(positions)
+
+    def find_by_date(self, date_from, date_to):
+        return list(self.stream_by_date(date_from, date_to)[0])
+
+    def find_by_category(self, category):
+        return list(self.stream_by_category(category)[0])
+
+    def compute(self, expression, date_from=None, date_to=None, **variables):
+        if "amount" in variables:
+            raise ValueError("переменная amount задаётся суммами записей и не может быть переопределена.")
+        if date_from is not None or date_to is not None:
+            if date_from is None or date_to is None:
+                raise ValueError("нужно указать обе даты.")
+            positions = self.records.date_range(self.parse_date(date_from), self.parse_date(date_to))
+        else:
+            positions = np.arange(len(self.records))
+        values = evaluate_columns(expression, {"amount": self.records.amounts[positions], **variables})
+        return self.records.ids[positions], values
+
+    def report(self, date_from, date_to):
+        return FinanceReport(self.records, self.parse_date(date_from), self.parse_date(date_to), self.get_rollups())
 
     def add_record(self):
-        record_id = max([record.id for record in self.records], default=0) + 1
         while True:
             try:
                 amount = float(input("Введите сумму операции (положительное число для дохода, отрицательное для расхода): "))
-                break
             except ValueError:
-                print("Ошибка: сумма должна быть числом.")
+                amount = math.nan
+            if math.isfinite(amount):
+                break
+            print("Ошибка: сумма должна быть числом.")
         category = input("Введите категорию операции: ").strip()
         date = input("Введите дату операции (ДД-ММ-ГГГГ): ").strip()
         description = input("Введите описание операции (или оставьте пустым): ").strip()
 
-        # Проверка даты
         try:
-            datetime.strptime(date, "%d-%m-%Y")
+            new_record = self.insert(amount, category, date, description)
         except ValueError:
             print("Ошибка: неверный формат даты. Используйте формат ДД-ММ-ГГГГ.")
             return
-
-        new_record = FinanceRecord(record_id, amount, category, date, description)
-        self.records.append(new_record)
-        self.save_records()
-        print(f"Запись с ID {record_id} успешно добавлена.")
+        print(f"Запись с ID {new_record.id} успешно добавлена.")
 
     def filter_records(self):
         filter_choice = input("Фильтровать по дате или категории? (введите 'дата' или 'категория' или оставьте пустым): ").strip().lower()
         if not filter_choice:
-            filtered = self.records
+            filtered, total = self.iter_records(), len(self.records)
         elif filter_choice == "дата":
             date_from = input("Введите начальную дату (ДД-ММ-ГГГГ): ").strip()
             date_to = input("Введите конечную дату (ДД-ММ-ГГГГ): ").strip()
             try:
-                date_from_dt = datetime.strptime(date_from, "%d-%m-%Y")
-                date_to_dt = datetime.strptime(date_to, "%d-%m-%Y")
+                filtered, total = self.stream_by_date(date_from, date_to)
             except ValueError:
                 print("Ошибка: неверный формат даты.")
                 return
-            filtered = [record for record in self.records if date_from_dt <= datetime.strptime(record.date, "%d-%m-%Y") <= date_to_dt]
         elif filter_choice == "категория":
             category = input("Введите категорию для фильтрации: ").strip()
-            filtered = [record for record in self.records if category.lower() in record.category.lower()]
+            filtered, total = self.stream_by_category(category)
         else:
             print("Ошибка: неверный выбор фильтра.")
             return
 
-        if filtered:
-            print("Фильтрованные записи:")
-            for record in filtered:
-                print(f"[ID: {record.id}] {record.date} | {record.category} | Сумма: {record.amount} | Описание: {record.description}")
-        else:
-            print("Записи не найдены.")
+        show_pages(filtered, self.format_record, "Фильтрованные записи:", "Записи не найдены.", total=total)
+
+    @staticmethod
+    def format_record(record):
+        return f"[ID: {record.id}] {record.date} | {record.category} | Сумма: {record.amount} | Описание: {record.description}"
 
     def generate_report(self):
         date_from = input("Введите начальную дату для отчёта (ДД-ММ-ГГГГ): ").strip()
         date_to = input("Введите конечную дату для отчёта (ДД-ММ-ГГГГ): ").strip()
         try:
-            datetime.strptime(date_from, "%d-%m-%Y")
-            datetime.strptime(date_to, "%d-%m-%Y")
+            report = self.report(date_from, date_to)
         except ValueError:
             print("Ошибка: неверный формат даты.")
             return
 
-        filtered_records = [record for record in self.records if date_from <= record.date <= date_to]
-        if not filtered_records:
+        if not report.count:
             print("Нет записей для указанного периода.")
             return
 
-        income = sum(record.amount for record in filtered_records if record.amount > 0)
-        expense = sum(record.amount for record in filtered_records if record.amount < 0)
-        balance = income + expense
-
         print(f"Отчёт за период с {date_from} по {date_to}:")
-        print(f"Доходы: {income}")
-        print(f"Расходы: {expense}")
-        print(f"Баланс: {balance}")
+        print(f"Доходы: {report.income}")
+        print(f"Расходы: {report.expense}")
+        print(f"Баланс: {report.balance}")
+        print("По категориям:")
+        for category, income, expense in report.by_category:
+            print(f"  {category}: доходы {income}, расходы {expense}")
+        print("По месяцам:")
+        for month, income, expense in report.by_month:
+            print(f"  {month}: доходы {income}, расходы {expense}")
 
         file_name = f"report_{date_from}_{date_to}.csv"
-        df = pd.DataFrame([record.to_dict() for record in self.records])
-        df.to_csv(file_name, index=False, encoding="utf-8")
+        report.to_frame().to_csv(file_name, index=False, encoding="utf-8")
         print(f"Подробная информация сохранена в файл {file_name}.")
 
     def export_records_to_csv(self):
@@ -136,49 +269,125 @@ class FinanceManager:
         if not file_name.endswith(".csv"):
             print("Ошибка: имя файла должно заканчиваться на .csv.")
             return
+        import pandas as pd
+
         try:
-            df = pd.DataFrame([record.to_dict() for record in self.records])
+            df = pd.DataFrame(self.dump_records())
             df.to_csv(file_name, index=False, encoding="utf-8")
             print(f"Финансовые записи успешно экспортированы в файл {file_name}.")
         except Exception as e:
             print(f"Ошибка при экспорте: {e}")
 
+    @staticmethod
+    def validate_chunk(chunk):
+        import pandas as pd
+
+        amounts = pd.to_numeric(chunk["amount"], errors="coerce").to_numpy(dtype="float64")
+        dates = np.char.strip(chunk["date"].to_numpy(dtype="U"))
+        days = parse_dates(dates)
+        errors = np.where(~np.isfinite(amounts), "некорректная сумма", np.where(np.isnat(days), "некорректная дата", ""))
+        valid = errors == ""
+        codes, categories = pd.factorize(chunk["category"])
+        categories = np.char.strip(categories.to_numpy(dtype="U"))
+        if "description" in chunk.columns:
+            descriptions = np.char.strip(chunk["description"].to_numpy(dtype="U"))
+        else:
+            descriptions = np.full(len(chunk), "")
+        clean = pd.DataFrame({
+            "amount": amounts[valid],
+            "category": categories[codes[valid]],
+            "date": dates[valid],
+            "day": days[valid],
+            "description": descriptions[valid],
+        }, index=chunk.index[valid])
+        rejected = chunk[~valid].assign(error=errors[~valid])
+        return clean, rejected
+
+    def insert_frame(self, clean):
+        ids = self.storage.allocate_ids(len(clean))
+        amounts = clean["amount"].to_numpy()
+        categories = clean["category"].tolist()
+        dates = clean["date"].tolist()
+        descriptions = clean["description"].tolist()
+        if self.store is not None:
+            start = len(self.store)
+            self.store.extend(ids, amounts, categories, clean["day"].to_numpy(dtype="datetime64[D]"), descriptions)
+            self.update_rollups(start)
+        self.storage.create_many([
+            FinanceRecord(record_id, amount, category, date, description).to_dict()
+            for record_id, amount, category, date, description
+            in zip(ids, amounts.tolist(), categories, dates, descriptions)
+        ])
+
+    def import_files(self, file_names, workers=None):
+        import pandas as pd
+
+        if len(file_names) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = list(executor.map(parse_csv_file, file_names))
+        else:
+            parsed = [parse_csv_file(file_name) for file_name in file_names]
+
+        results, frames = [], []
+        for file_name, clean, rejected, error in parsed:
+            if error is not None:
+                results.append((file_name, 0, 0, error))
+                continue
+            report = ImportReport(f"{file_name}{ERRORS_SUFFIX}")
+            report.write_rejected(rejected)
+            if not clean.empty:
+                frames.append(clean)
+            results.append((file_name, len(clean), len(rejected), None))
+        if frames:
+            self.insert_frame(pd.concat(frames, ignore_index=True))
+        return results
+
     def import_records_from_csv(self):
-        file_name = input("Введите имя файла для импорта (например, finance.csv): ").strip()
+        file_name = input("Введите имя файла, папку или шаблон для импорта (например, finance.csv или exports/*.csv): ").strip()
+        file_names = find_csv_files(file_name)
+        if file_names != [file_name]:
+            self.import_many_from_csv(file_names)
+            return
+        import pandas as pd
+
         try:
-            df = pd.read_csv(file_name, encoding="utf-8")
-            if not {"amount", "category", "date"}.issubset(df.columns):
-                print("Ошибка: некорректный формат файла.")
-                return
-            max_id = max([record.id for record in self.records], default=0)
-            for _, row in df.iterrows():
-                try:
-                    amount = float(row["amount"])
-                except ValueError:
-                    print(f"Ошибка: некорректная сумма '{row['amount']}' в файле.")
-                    continue
-                category = row["category"].strip()
-                date = row["date"].strip()
-                description = row.get("description", "").strip()
-                try:
-                    datetime.strptime(date, "%d-%m-%Y")
-                except ValueError:
-                    print(f"Ошибка: некорректная дата '{date}' в файле.")
-                    continue
-
-                max_id += 1
-                self.records.append(FinanceRecord(
-                    record_id=max_id,
-                    amount=amount,
-                    category=category,
-                    date=date,
-                    description=description
-                ))
-            self.save_records()
+            report = ImportReport(f"{file_name}{ERRORS_SUFFIX}")
+            for chunk in read_csv_chunks(file_name):
+                if not REQUIRED_COLUMNS.issubset(chunk.columns):
+                    print("Ошибка: некорректный формат файла.")
+                    return
+                clean, rejected = self.validate_chunk(chunk)
+                for row, message in rejected["error"].items():
+                    report.error(row, message)
+                report.write_rejected(rejected)
+                if not clean.empty:
+                    self.insert_frame(clean)
+                    report.imported += len(clean)
+            report.summary()
             print(f"Финансовые записи успешно импортированы из файла {file_name}.")
         except FileNotFoundError:
             print("Ошибка: файл не найден.")
         except pd.errors.EmptyDataError:
             print("Ошибка: файл пустой.")
         except Exception as e:
-            print(f"Ошибка при импорте: {e}")
\ No newline at end of file
+            print(f"Ошибка при импорте: {e}")
+
+    def import_many_from_csv(self, file_names):
+        if not file_names:
+            print("Ошибка: CSV-файлы не найдены.")
+            return
+        try:
+            results = self.import_files(file_names)
+        except Exception as e:
+            print(f"Ошибка при импорте: {e}")
+            return
+        for file_name, imported, errors, error in results:
+            if error is not None:
+                print(f"Ошибка в файле {file_name}: {error}")
+            elif errors:
+                print(f"{file_name}: импортировано записей: {imported}, пропущено строк с ошибками: {errors} "
+                      f"(сохранены в файл {file_name}{ERRORS_SUFFIX}).")
+            else:
+                print(f"{file_name}: импортировано записей: {imported}.")
+        total = sum(imported for _, imported, _, _ in results)
+        print(f"Всего импортировано записей: {total} из {len(file_names)} файлов.")
@@ -1,17 +1,78 @@
-from notes import NotesManager
-from tasks import TasksManager
-from contacts import ContactsManager
-from financial_records import FinanceManager
+import importlib
+import threading
+
 from calculator import Calculator
 
 
+MANAGERS = {
+    "notes": ("notes", "NotesManager"),
+    "tasks": ("tasks", "TasksManager"),
+    "contacts": ("contacts", "ContactsManager"),
+    "finance": ("financial_records", "FinanceManager"),
+}
+
+
 class MainManager:
-    def __init__(self):
-        self.notes_manager = NotesManager()
-        self.tasks_manager = TasksManager()
-        self.contacts_manager = ContactsManager()
-        self.finance_manager = FinanceManager()
+    def __init__(self, database=None, prefetch=False, reminders=False):
+        self.database = database
+        self.reminders = reminders
+        self.managers = {}
+        self.locks = {name: threading.Lock() for name in MANAGERS}
         self.calculator = Calculator()
+        if prefetch and not database:
+            threading.Thread(target=self.prefetch, daemon=True).start()
+
+    def get_manager(self, name):
+        manager = self.managers.get(name)
+        if manager is not None:
+            manager.refresh()
+            return manager
+        return self.load_manager(name)
+
+    def load_manager(self, name):
+        with self.locks[name]:
+            if name not in self.managers:
+                module_name, class_name = MANAGERS[name]
+                manager_class = getattr(importlib.import_module(module_name), class_name)
+                manager = manager_class(self.database) if self.database else manager_class()
+                if name == "tasks" and self.reminders:
+                    manager.start_reminders(manager.print_reminder)
+                self.managers[name] = manager
+        return self.managers[name]
+
+    def close(self):
+        tasks = self.managers.get("tasks")
+        if tasks is not None:
+            tasks.stop_reminders()
+        for manager in list(self.managers.values()):
+            manager.storage.flush()
+            manager.refresh()
+        notes = self.managers.get("notes")
+        if notes is not None:
+            notes.save_index()
+        finance = self.managers.get("finance")
+        if finance is not None:
+            finance.save_rollups()
+
+    def prefetch(self):
+        for name in MANAGERS:
+            self.load_manager(name)
+
+    @property
+    def notes_manager(self):
+        return self.get_manager("notes")
+
+    @property
+    def tasks_manager(self):
+        return self.get_manager("tasks")
+
+    @property
+    def contacts_manager(self):
+        return self.get_manager("contacts")
+
+    @property
+    def finance_manager(self):
+        return self.get_manager("finance")
 
     @staticmethod
     def show_notes_menu():
@@ -23,7 +84,8 @@ class MainManager:
         print("5. Удалить заметку")
         print("6. Экспорт заметок в CSV")
         print("7. Импорт заметок из CSV")
-        print("8. Назад в главное меню")
+        print("8. Поиск заметок")
+        print("9. Назад в главное меню")
 
     def manage_notes(self):
         while True:
@@ -44,6 +106,8 @@ class MainManager:
             elif choice == "7":
                 self.notes_manager.import_notes_from_csv()
             elif choice == "8":
+                self.notes_manager.search_notes()
+            elif choice == "9":
                 break
             else:
                 print("Ошибка: неверный выбор. Попробуйте снова.")
@@ -58,7 +122,8 @@ class MainManager:
         print("5. Удалить задачу")
         print("6. Экспорт задач в CSV")
         print("7. Импорт задач из CSV")
-        print("8. Назад")
+        print("8. Просроченные и ближайшие задачи")
+        print("9. Назад")
 
     def manage_tasks(self):
         while True:
@@ -79,6 +144,8 @@ class MainManager:
             elif choice == "7":
                 self.tasks_manager.import_tasks_from_csv()
             elif choice == "8":
+                self.tasks_manager.view_deadlines()
+            elif choice == "9":
                 break
             else:
                 print("Ошибка: неверный выбор. Попробуйте снова.")
@@ -148,7 +215,8 @@ class MainManager:
     def show_calculator_menu():
         print("\nВыберите операцию:")
         print("1. Ввести арифметическое выражение")
-        print("2. Выход")
+        print("2. Вычислить выражения из файла")
+        print("3. Выход")
 
     def manage_calculator(self):
         while True:
@@ -158,6 +226,9 @@ class MainManager:
                 expression = input("Введите арифметическое выражение: ")
                 self.calculator.calculate(expression)
             elif choice == "2":
+                file_name = input("Введите имя файла с выражениями (по одному на строке): ").strip()
+                self.calculator.calculate_file(file_name)
+            elif choice == "3":
                 break
             else:
                 print("Ошибка: неверный выбор. Попробуйте снова.")
@@ -1,7 +1,27 @@
-import json
-import pandas as pd
+import atexit
+import weakref
+import zlib
 from datetime import datetime
 
+from csv_import import ImportReport, read_csv_chunks
+from paging import show_pages
+from search_index import InvertedIndex
+from storage import make_storage
+
+
+OPEN_MANAGERS = weakref.WeakSet()
+
+
+def save_indexes():
+    for manager in list(OPEN_MANAGERS):
+        try:
+            manager.save_index()
+        except OSError:
+            pass
+
+
+atexit.register(save_indexes)
+
 
 class Note:
     def __init__(self, note_id, title, content, timestamp=None):
@@ -31,43 +51,127 @@ class Note:
 class NotesManager:
     def __init__(self, file_name="notes.json"):
         self.file_name = file_name
+        self.storage = make_storage(file_name, "notes", self.dump_notes)
         self.notes = self.load_notes()
+        self.index_file_name = file_name + ".idx"
+        self.index_fingerprint = None
+        self.index = self.load_index()
+        OPEN_MANAGERS.add(self)
 
     def load_notes(self):
-        try:
-            with open(self.file_name, "r", encoding="utf-8") as file:
-                return [Note.from_dict(note) for note in json.load(file)]
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        notes = (Note.from_dict(note) for note in self.storage.load())
+        return {note.id: note for note in notes}
 
     def save_notes(self):
-        with open(self.file_name, "w", encoding="utf-8") as file:
-            json.dump([note.to_dict() for note in self.notes], file, indent=4, ensure_ascii=False)
+        self.storage.save(self.dump_notes())
+        self.save_index()
+
+    def fingerprint(self):
+        version = self.storage.version()
+        if version is not None:
+            return f"{version}-{len(self.notes)}"
+        checksum = 0
+        for note in self.notes.values():
+            checksum = zlib.crc32(f"{note.id}:{note.timestamp};".encode("utf-8"), checksum)
+        return f"{len(self.notes)}-{checksum}"
+
+    def load_index(self):
+        self.index_fingerprint = self.fingerprint()
+        index = InvertedIndex.load(self.index_file_name, self.index_fingerprint)
+        if index is None:
+            index = InvertedIndex()
+            for note in self.notes.values():
+                index.add(note.id, note.title, note.content)
+        return index
+
+    def save_index(self):
+        self.refresh()
+        fingerprint = self.fingerprint()
+        if self.index.dirty or fingerprint != self.index_fingerprint:
+            self.index.save(self.index_file_name, fingerprint)
+            self.index_fingerprint = fingerprint
+
+    def dump_notes(self):
+        return [note.to_dict() for note in self.notes.values()]
+
+    def batch(self):
+        return self.storage.batch()
+
+    def refresh(self):
+        reload, entries = self.storage.poll()
+        if reload:
+            self.notes = self.load_notes()
+            self.index = self.load_index()
+        for entry in entries:
+            if entry["op"] == "delete":
+                self.notes.pop(entry["id"], None)
+                self.index.remove(entry["id"])
+            else:
+                note = Note.from_dict(entry["item"])
+                self.notes[note.id] = note
+                self.index.update(note.id, note.title, note.content)
+
+    def insert(self, title, content=""):
+        title = title.strip()
+        if not title:
+            raise ValueError("заголовок не может быть пустым.")
+        note = Note(self.storage.allocate_id(), title, content.strip())
+        self.notes[note.id] = note
+        self.index.add(note.id, note.title, note.content)
+        self.storage.create(note.to_dict())
+        return note
+
+    def update(self, note_id, title=None, content=None):
+        note = self.notes.get(note_id)
+        if note is None:
+            raise ValueError("заметка с таким ID не найдена.")
+        if title:
+            note.title = title
+        if content:
+            note.content = content
+        note.timestamp = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+        self.index.update(note.id, note.title, note.content)
+        self.storage.update(note.to_dict())
+        return note
+
+    def remove(self, note_id):
+        if note_id not in self.notes:
+            raise ValueError("заметка с таким ID не найдена.")
+        del self.notes[note_id]
+        self.index.remove(note_id)
+        self.storage.delete(note_id)
+
+    def search(self, query, limit=None):
+        return [self.notes[note_id] for note_id in self.index.search(query, limit) if note_id in self.notes]
 
     def create_note(self):
-        note_id = max([note.id for note in self.notes], default=0) + 1
         title = input("Введите заголовок заметки: ").strip()
         if not title:
             print("Ошибка: заголовок не может быть пустым.")
             return
         content = input("Введите содержимое заметки: ").strip()
-        new_note = Note(note_id, title, content)
-        self.notes.append(new_note)
-        self.save_notes()
-        print(f"Заметка с ID {note_id} успешно создана.")
+        new_note = self.insert(title, content)
+        print(f"Заметка с ID {new_note.id} успешно создана.")
+
+    @staticmethod
+    def format_note(note):
+        return f"[ID: {note.id}] {note.title} - {note.timestamp}"
 
     def view_notes(self):
-        if not self.notes:
-            print("Список заметок пуст.")
+        show_pages(self.notes.values(), self.format_note, "Список заметок:", "Список заметок пуст.", total=len(self.notes))
+
+    def search_notes(self):
+        query = input("Введите слова для поиска: ").strip()
+        if not query:
+            print("Ошибка: запрос не может быть пустым.")
             return
-        print("Список заметок:")
-        for note in self.notes:
-            print(f"[ID: {note.id}] {note.title} - {note.timestamp}")
+        results = self.search(query)
+        show_pages(results, self.format_note, "Найденные заметки:", "Заметки не найдены.", total=len(results))
 
     def view_note_details(self):
         try:
             note_id = int(input("Введите ID заметки для просмотра: "))
-            note = next((note for note in self.notes if note.id == note_id), None)
+            note = self.notes.get(note_id)
         except ValueError:
             print("Ошибка: ID должен быть числом.")
             return
@@ -81,19 +185,14 @@ class NotesManager:
     def edit_note(self):
         try:
             note_id = int(input("Введите ID заметки для редактирования: "))
-            note = next((note for note in self.notes if note.id == note_id), None)
+            note = self.notes.get(note_id)
         except ValueError:
             print("Ошибка: ID должен быть числом.")
             return
         if note:
             new_title = input("Введите новый заголовок заметки (оставьте пустым для сохранения текущего): ").strip()
             new_content = input("Введите новое содержимое заметки (оставьте пустым для сохранения текущего): ").strip()
-            if new_title:
-                note.title = new_title
-            if new_content:
-                note.content = new_content
-            note.timestamp = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-            self.save_notes()
+            self.update(note_id, new_title, new_content)
             print(f"Заметка с ID {note_id} успешно обновлена.")
         else:
             print("Ошибка: заметка с таким ID не найдена.")
@@ -104,12 +203,11 @@ class NotesManager:
         except ValueError:
             print("Ошибка: ID должен быть числом.")
             return
-        if any(note.id == note_id for note in self.notes):
-            self.notes = [note for note in self.notes if note.id != note_id]
-            self.save_notes()
+        try:
+            self.remove(note_id)
             print(f"Заметка с ID {note_id} успешно удалена.")
-        else:
-            print("Ошибка: заметка с таким ID не найдена.")
+        except ValueError as e:
+            print(f"Ошибка: {e}")
 
     def export_notes_to_csv(self):
         if not self.notes:
@@ -119,8 +217,10 @@ class NotesManager:
         if not file_name.endswith(".csv"):
             print("Ошибка: имя файла должно заканчиваться на .csv.")
             return
+        import pandas as pd
+
         try:
-            df = pd.DataFrame([note.to_dict() for note in self.notes])
+            df = pd.DataFrame(self.dump_notes())
             df.to_csv(file_name, index=False, encoding="utf-8")
             print(f"Заметки успешно экспортированы в файл {file_name}.")
         except Exception as e:
@@ -128,16 +228,37 @@ class NotesManager:
 
     def import_notes_from_csv(self):
         file_name = input("Введите имя файла для импорта (например, notes.csv): ").strip()
+        import pandas as pd
+
         try:
-            df = pd.read_csv(file_name, encoding="utf-8")
-            if not {"title", "content", "timestamp"}.issubset(df.columns):
-                print("Ошибка: некорректный формат файла.")
-                return
-            max_id = max([note.id for note in self.notes], default=0)
-            for _, row in df.iterrows():
-                max_id += 1
-                self.notes.append(Note(max_id, row["title"], row["content"], row["timestamp"]))
-            self.save_notes()
+            report = ImportReport()
+            for chunk in read_csv_chunks(file_name):
+                if not {"title", "content", "timestamp"}.issubset(chunk.columns):
+                    print("Ошибка: некорректный формат файла.")
+                    return
+                titles = chunk["title"].str.strip()
+                bad_title = titles == ""
+                report.reject(chunk, bad_title, "пустой заголовок")
+
+                valid = ~bad_title
+                count = int(valid.sum())
+                if not count:
+                    continue
+                new_notes = [
+                    Note(note_id, title, content, timestamp or None)
+                    for note_id, title, content, timestamp in zip(
+                        self.storage.allocate_ids(count),
+                        titles[valid].tolist(),
+                        chunk["content"][valid].tolist(),
+                        chunk["timestamp"][valid].str.strip().tolist(),
+                    )
+                ]
+                for note in new_notes:
+                    self.notes[note.id] = note
+                    self.index.add(note.id, note.title, note.content)
+                self.storage.create_many([note.to_dict() for note in new_notes])
+                report.imported += count
+            report.summary()
             print(f"Заметки успешно импортированы из файла {file_name}.")
         except FileNotFoundError:
             print("Ошибка: файл не найден.")
@@ -0,0 +1,80 @@
+import sys
+from itertools import chain, islice
+
+
+PAGE_SIZE = 20
+BUFFER_SIZE = 64 * 1024
+
+
+def write_lines(lines, stream=None, buffer_size=BUFFER_SIZE):
+    stream = stream or sys.stdout
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line) + 1
+        if size >= buffer_size:
+            buffer.append("")
+            stream.write("\n".join(buffer))
+            buffer, size = [], 0
+    if buffer:
+        buffer.append("")
+        stream.write("\n".join(buffer))
+    stream.flush()
+
+
+def cursor_of(item, key=None):
+    return item.id if key is None else (key(item), item.id)
+
+
+def after_cursor(items, after=None, key=None):
+    if after is None:
+        return iter(items)
+    return (item for item in items if cursor_of(item, key) > after)
+
+
+class Pager:
+    def __init__(self, items, page_size=PAGE_SIZE, key=None):
+        self.items = iter(items)
+        self.page_size = page_size
+        self.key = key
+        self.shown = 0
+        self.cursor = None
+        self.pending = list(islice(self.items, 1))
+
+    @property
+    def has_more(self):
+        return bool(self.pending)
+
+    def next_page(self):
+        page = self.pending + list(islice(self.items, self.page_size))
+        page, self.pending = page[:self.page_size], page[self.page_size:]
+        if page:
+            self.shown += len(page)
+            self.cursor = cursor_of(page[-1], self.key)
+        return page
+
+    def rest(self):
+        items, self.pending = chain(self.pending, self.items), []
+        for item in items:
+            self.shown += 1
+            self.cursor = cursor_of(item, self.key)
+            yield item
+
+
+def show_pages(items, format_item, header, empty_message, total=None, page_size=PAGE_SIZE):
+    pager = Pager(items, page_size)
+    if not pager.has_more:
+        print(empty_message)
+        return
+    print(header)
+    while True:
+        write_lines(map(format_item, pager.next_page()))
+        if not pager.has_more:
+            return
+        shown = f"Показано {pager.shown} из {total}" if total is not None else f"Показано {pager.shown}"
+        answer = input(f"{shown}. Enter — следующие {page_size}, 'все' — остальные, q — выход: ").strip().lower()
+        if answer == "q":
+            return
+        if answer == "все":
+            write_lines(map(format_item, pager.rest()))
+            return
@@ -1,3 +1,8 @@
+import atexit
+import signal
+import sys
+
+import cli
 from main_manager import MainManager
 
 
@@ -25,6 +30,7 @@ def main_menu(manager):
         elif choice == "5":
             manager.manage_calculator()
         elif choice == "6":
+            manager.close()
             print("Спасибо за использование Персонального помощника! До свидания!")
             break
         else:
@@ -32,5 +38,12 @@ def main_menu(manager):
 
 
 if __name__ == "__main__":
-    manager = MainManager()
-    main_menu(manager)
+    args = cli.build_parser().parse_args()
+    if args.command is None:
+        cli.configure(args)
+        manager = MainManager(args.db, prefetch=True, reminders=True)
+        atexit.register(manager.close)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        main_menu(manager)
+    else:
+        sys.exit(cli.run(args))
@@ -0,0 +1,194 @@
+import bisect
+import json
+import math
+import re
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(text.lower().replace("ё", "е"))
+
+
+class InvertedIndex:
+    def __init__(self, title_weight=3):
+        self.title_weight = title_weight
+        self.postings = {}
+        self.documents = {}
+        self.vocabulary = None
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, doc_id, title, content):
+        frequencies = {}
+        for token in tokenize(title):
+            frequencies[token] = frequencies.get(token, 0) + self.title_weight
+        for token in tokenize(content):
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for token, frequency in frequencies.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                self.vocabulary = None
+            self.postings[token][doc_id] = frequency
+        self.documents[doc_id] = list(frequencies)
+        self.dirty = True
+
+    def remove(self, doc_id):
+        for token in self.documents.pop(doc_id, []):
+            documents = self.postings[token]
+            documents.pop(doc_id, None)
+            if not documents:
+                del self.postings[token]
+                self.vocabulary = None
+        self.dirty = True
+
+    def update(self, doc_id, title, content):
+        self.remove(doc_id)
+        self.add(doc_id, title, content)
+
+    def expand(self, token):
+        if self.vocabulary is None:
+            self.vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self.vocabulary, token)
+        stop = bisect.bisect_left(self.vocabulary, token + "￿")
+        return self.vocabulary[start:stop]
+
+    def search(self, query, limit=None):
+        scores = None
+        total = len(self.documents)
+        for token in set(tokenize(query)):
+            token_scores = {}
+            for term in self.expand(token):
+                documents = self.postings[term]
+                idf = math.log(1 + total / len(documents))
+                for doc_id, frequency in documents.items():
+                    token_scores[doc_id] = token_scores.get(doc_id, 0) + frequency * idf
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id] for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                return []
+        if not scores:
+            return []
+        return sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))[:limit]
+
+    def save(self, file_name, fingerprint):
+        with open(file_name, "w", encoding="utf-8") as file:
+            json.dump({"fingerprint": fingerprint, "postings": self.postings}, file, ensure_ascii=False)
+        self.dirty = False
+
+    @staticmethod
+    def load(file_name, fingerprint):
+        try:
+            with open(file_name, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if data.get("fingerprint") != fingerprint:
+            return None
+        index = InvertedIndex()
+        for token, documents in data["postings"].items():
+            index.postings[token] = {int(doc_id): frequency for doc_id, frequency in documents.items()}
+            for doc_id in index.postings[token]:
+                index.documents.setdefault(doc_id, []).append(token)
+        return index
+
+
+class TrigramIndex:
+    def __init__(self, size=3):
+        self.size = size
+        self.postings = {}
+        self.texts = {}
+
+    @staticmethod
+    def normalize(text):
+        if not isinstance(text, str):
+            return ""
+        return text.lower().replace("ё", "е")
+
+    def grams(self, text):
+        return {text[i:i + n] for n in range(1, self.size + 1) for i in range(len(text) - n + 1)}
+
+    def add(self, doc_id, text):
+        text = self.normalize(text)
+        self.texts[doc_id] = text
+        for gram in self.grams(text):
+            self.postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        for gram in self.grams(self.texts.pop(doc_id, "")):
+            documents = self.postings[gram]
+            documents.discard(doc_id)
+            if not documents:
+                del self.postings[gram]
+
+    def search(self, query):
+        query = self.normalize(query)
+        if not query:
+            return set(self.texts)
+        if len(query) <= self.size:
+            return set(self.postings.get(query, ()))
+        grams = sorted((query[i:i + self.size] for i in range(len(query) - self.size + 1)),
+                       key=lambda gram: len(self.postings.get(gram, ())))
+        candidates = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates &= self.postings.get(gram, set())
+        return {doc_id for doc_id in candidates if query in self.texts[doc_id]}
+
+
+class PrefixTrie:
+    def __init__(self):
+        self.root = {"ids": set()}
+        self.keys = {}
+
+    @staticmethod
+    def normalize(phone):
+        if not isinstance(phone, str):
+            return ""
+        return "".join(char for char in phone if char.isdigit())
+
+    def add(self, doc_id, phone):
+        digits = self.normalize(phone)
+        self.keys[doc_id] = digits
+        if not digits:
+            return
+        node = self.root
+        for digit in digits:
+            node = node.setdefault(digit, {"ids": set()})
+            node["ids"].add(doc_id)
+
+    def remove(self, doc_id):
+        digits = self.keys.pop(doc_id, "")
+        path = [self.root]
+        for digit in digits:
+            path.append(path[-1][digit])
+        for depth in range(len(digits), 0, -1):
+            node = path[depth]
+            node["ids"].discard(doc_id)
+            if not node["ids"]:
+                del path[depth - 1][digits[depth - 1]]
+
+    def search(self, prefix):
+        digits = self.normalize(prefix)
+        if not digits:
+            return set()
+        node = self.root
+        for digit in digits:
+            node = node.get(digit)
+            if node is None:
+                return set()
+        return set(node["ids"])
+
+    def contains(self, part):
+        digits = self.normalize(part)
+        if not digits:
+            return set()
+        return {doc_id for doc_id, key in self.keys.items() if digits in key}
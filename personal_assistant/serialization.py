@@ -0,0 +1,181 @@
+import json
+import struct
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+JSONL_HEADER = "jsonl"
+MSGPACK_MAGIC = b"PAMSGP1\0"
+FINANCE_MAGIC = b"PAFIN01\0"
+FINANCE_HEADER = struct.Struct("<8sqqq")
+DATE_ORDER = [8, 9, 7, 5, 6, 4, 0, 1, 2, 3]
+
+
+def dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class PrettyJsonCodec:
+    name = "pretty"
+
+    @staticmethod
+    def dump(next_id, items):
+        return json.dumps({"next_id": next_id, "items": items}, indent=4, ensure_ascii=False).encode("utf-8")
+
+
+class JsonCodec:
+    name = "json"
+
+    @staticmethod
+    def dump(next_id, items):
+        return dumps({"next_id": next_id, "items": items})
+
+
+class JsonLinesCodec:
+    name = "jsonl"
+
+    @staticmethod
+    def dump(next_id, items):
+        lines = [dumps({"format": JSONL_HEADER, "next_id": next_id})]
+        lines.extend(dumps(item) for item in items)
+        lines.append(b"")
+        return b"\n".join(lines)
+
+    @staticmethod
+    def load(file):
+        return [loads(line) for line in file if line.strip()]
+
+
+class MsgpackCodec:
+    name = "msgpack"
+
+    @staticmethod
+    def dump(next_id, items):
+        return MSGPACK_MAGIC + msgpack.packb({"next_id": next_id, "items": items}, use_bin_type=True)
+
+    @staticmethod
+    def load(data):
+        if msgpack is None:
+            raise RuntimeError("файл сохранён в формате msgpack, установите пакет msgpack (pip install msgpack).")
+        value = msgpack.unpackb(data, raw=False)
+        return value["next_id"], value["items"]
+
+
+class FinanceStructCodec:
+    name = "struct"
+    tables = {"finance"}
+
+    @staticmethod
+    def dump(next_id, items):
+        import numpy as np
+
+        from finance_store import parse_dates
+
+        categories = {}
+        codes = np.array([categories.setdefault(item["category"], len(categories)) for item in items], dtype="<i4")
+        descriptions = [item.get("description", "").encode("utf-8") for item in items]
+        offsets = np.zeros(len(items) + 1, dtype="<i8")
+        np.cumsum([len(description) for description in descriptions], out=offsets[1:])
+        dates = parse_dates([item["date"] for item in items])
+        raw_dates = {str(position): items[position]["date"] for position in np.flatnonzero(np.isnat(dates)).tolist()}
+        category_blob = dumps({"categories": list(categories), "raw_dates": raw_dates} if raw_dates else list(categories))
+        parts = [
+            FINANCE_HEADER.pack(FINANCE_MAGIC, next_id, len(items), len(category_blob)),
+            np.array([item["id"] for item in items], dtype="<i8").tobytes(),
+            np.array([item["amount"] for item in items], dtype="<f8").tobytes(),
+            dates.astype("<i4").tobytes(),
+            codes.tobytes(),
+            offsets.tobytes(),
+            category_blob,
+            b"".join(descriptions),
+        ]
+        return b"".join(parts)
+
+    @staticmethod
+    def load(data):
+        import numpy as np
+
+        _, next_id, count, category_size = FINANCE_HEADER.unpack_from(data)
+        position = FINANCE_HEADER.size
+
+        def column(dtype, length):
+            nonlocal position
+            values = np.frombuffer(data, dtype=dtype, count=length, offset=position)
+            position += values.nbytes
+            return values
+
+        ids = column("<i8", count).tolist()
+        amounts = column("<f8", count).tolist()
+        iso_dates = np.datetime_as_string(column("<i4", count).astype("datetime64[D]"), unit="D").astype("U10")
+        dates = iso_dates.view("U1").reshape(-1, 10)[:, DATE_ORDER].copy().view("U10").ravel().tolist()
+        codes = column("<i4", count)
+        offsets = column("<i8", count + 1).tolist()
+        categories = loads(data[position:position + category_size])
+        if isinstance(categories, dict):
+            for date_position, date in categories["raw_dates"].items():
+                dates[int(date_position)] = date
+            categories = categories["categories"]
+        categories = np.array(categories, dtype=object)[codes].tolist()
+        heap = data[position + category_size:]
+        descriptions = [heap[start:stop].decode("utf-8") for start, stop in zip(offsets, offsets[1:])]
+        items = [
+            {"id": item_id, "amount": amount, "category": category, "date": date, "description": description}
+            for item_id, amount, category, date, description in zip(ids, amounts, categories, dates, descriptions)
+        ]
+        return next_id, items
+
+
+class FinanceColumnsCodec:
+    name = "columns"
+    tables = {"finance"}
+
+
+FORMATS = {
+    codec.name: codec
+    for codec in (PrettyJsonCodec, JsonCodec, JsonLinesCodec, MsgpackCodec, FinanceStructCodec, FinanceColumnsCodec)
+}
+
+
+def codec_for(format_name, table):
+    codec = FORMATS[format_name]
+    if codec is MsgpackCodec and msgpack is None:
+        raise RuntimeError("для формата msgpack нужен пакет msgpack (pip install msgpack).")
+    if table not in getattr(codec, "tables", {table}):
+        return JsonCodec
+    return codec
+
+
+def load(file):
+    head = file.read(len(FINANCE_MAGIC))
+    if head == FINANCE_MAGIC:
+        return FinanceStructCodec.load(head + file.read())
+    if head == MSGPACK_MAGIC:
+        return MsgpackCodec.load(file.read())
+    first_line = head + file.readline()
+    if not first_line.strip():
+        return None, []
+    try:
+        data = loads(first_line)
+    except ValueError:
+        data = loads(first_line + file.read())
+    if isinstance(data, dict) and data.get("format") == JSONL_HEADER:
+        return data["next_id"], JsonLinesCodec.load(file)
+    if isinstance(data, dict):
+        return data["next_id"], data["items"]
+    return None, data
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import signal
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from cli import DUMPS, ITEMS, apply, parse_done, task_filters
+from main_manager import MANAGERS
+
+
+MAX_BODY_SIZE = 1024 * 1024
+TASK_FILTERS = {
+    "status": "status",
+    "priority": "priority",
+    "due_date": "due_date",
+    "from": "date_from",
+    "to": "date_to",
+    "sort": "sort",
+    "desc": "desc",
+    "page": "page",
+    "page_size": "page_size",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AssistantServer:
+    def __init__(self, manager, flush_interval=0.05):
+        self.manager = manager
+        self.flush_interval = flush_interval
+        self.batches = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def open_batches(self):
+        targets = [self.manager.get_manager(name) for name in MANAGERS]
+        self.batches = ExitStack()
+        for target in targets:
+            self.batches.enter_context(target.batch())
+
+    def flush(self):
+        try:
+            self.batches.close()
+        except sqlite3.Error as error:
+            print(f"Ошибка сохранения: {error}", flush=True)
+        for manager in self.manager.managers.values():
+            manager.refresh()
+        self.open_batches()
+
+    def close(self):
+        self.batches.close()
+        self.manager.close()
+
+    async def run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.run(self.flush)
+
+    def find_item(self, kind, item_id):
+        try:
+            item_id = int(item_id)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "ID должен быть числом.") from None
+        items = getattr(self.manager.get_manager(kind), ITEMS[kind])
+        item = items.get(item_id)
+        if item is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "запись с таким ID не найдена.")
+        return item_id, item
+
+    def change(self, operation):
+        return apply(self.manager, operation)
+
+    def list_items(self, kind, query):
+        target = self.manager.get_manager(kind)
+        if kind in ("notes", "contacts") and "q" in query:
+            found = target.search(query["q"]) if kind == "notes" else target.find(query["q"])
+            return [item.to_dict() for item in found]
+        if kind == "tasks" and query.keys() & TASK_FILTERS:
+            options = {option: query[name] for name, option in TASK_FILTERS.items() if name in query}
+            options["desc"] = parse_done(options.get("desc", False))
+            tasks, _ = target.query(**task_filters(**options))
+            return [task.to_dict() for task in tasks]
+        if kind == "finance":
+            if "from" in query or "to" in query:
+                return [record.to_dict() for record in target.find_by_date(query.get("from", ""), query.get("to", ""))]
+            if "category" in query:
+                return [record.to_dict() for record in target.find_by_category(query["category"])]
+        return getattr(target, DUMPS[kind])()
+
+    def dispatch(self, method, path, query, body):
+        parts = [part for part in path.split("/") if part]
+        if not parts or parts[0] not in MANAGERS:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "неизвестный путь.")
+        kind = parts[0]
+
+        if kind == "finance" and parts[1:] == ["report"] and method == "GET":
+            report = self.manager.finance_manager.report(query.get("from", ""), query.get("to", ""))
+            return HTTPStatus.OK, {"from": query["from"], "to": query["to"], **report.to_dict()}
+        if len(parts) == 1:
+            if method == "GET":
+                return HTTPStatus.OK, self.list_items(kind, query)
+            if method == "POST":
+                return HTTPStatus.CREATED, self.change({"op": "add", "kind": kind, "data": body}).to_dict()
+        elif len(parts) == 2:
+            item_id, item = self.find_item(kind, parts[1])
+            if method == "GET":
+                return HTTPStatus.OK, item.to_dict()
+            if method in ("PUT", "PATCH"):
+                return HTTPStatus.OK, self.change({"op": "update", "kind": kind, "id": item_id, "data": body}).to_dict()
+            if method == "DELETE":
+                self.change({"op": "delete", "kind": kind, "id": item_id})
+                return HTTPStatus.NO_CONTENT, None
+        elif parts[2:] == ["done"] and kind == "tasks" and method == "POST":
+            item_id, item = self.find_item(kind, parts[1])
+            return HTTPStatus.OK, self.change({"op": "done", "kind": kind, "id": item_id}).to_dict()
+        else:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "неизвестный путь.")
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "метод не поддерживается.")
+
+    def respond(self, method, target, body):
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query, keep_blank_values=True).items()}
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "тело запроса должно быть JSON-объектом.")
+            return self.dispatch(method, url.path, query, data)
+        except HTTPError as error:
+            return error.status, {"error": str(error)}
+        except json.JSONDecodeError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": f"неверный JSON ({error.msg})."}
+        except (KeyError, TypeError, ValueError) as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        except (OSError, sqlite3.Error) as error:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": f"ошибка хранилища: {error}"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.send(writer, HTTPStatus.BAD_REQUEST, {"error": "неверный запрос."}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = headers.get("content-length") or "0"
+                length = int(length) if length.isdigit() else MAX_BODY_SIZE + 1
+                if length > MAX_BODY_SIZE:
+                    await self.send(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "слишком большой запрос."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                status, payload = await self.run(self.respond, method, target, body)
+                await self.send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def send(writer, status, payload, keep_alive):
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        await self.run(self.open_batches)
+        flusher = asyncio.create_task(self.flush_periodically())
+        server = await asyncio.start_server(self.handle, host, port)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        print(f"Сервер запущен на http://{host}:{port}/", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flusher.cancel()
+            await self.run(self.close)
+            self.executor.shutdown()
+
+
+def serve(manager, host="127.0.0.1", port=8000, flush_interval=0.05):
+    try:
+        asyncio.run(AssistantServer(manager, flush_interval).serve(host, port))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    print("Сервер остановлен.")
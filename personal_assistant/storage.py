@@ -0,0 +1,599 @@
+import atexit
+import os
+import shutil
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager, nullcontext
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import serialization
+
+
+ISO_DATE = "substr({0}, 7, 4) || '-' || substr({0}, 4, 2) || '-' || substr({0}, 1, 2)"
+
+SCHEMAS = {
+    "notes": {
+        "columns": "id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, timestamp TEXT",
+        "fields": ["id", "title", "content", "timestamp"],
+        "indexes": [],
+    },
+    "tasks": {
+        "columns": "id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, description TEXT, done INTEGER, priority TEXT, due_date TEXT",
+        "fields": ["id", "title", "description", "done", "priority", "due_date"],
+        "indexes": ["done", "priority", "due_date"],
+    },
+    "contacts": {
+        "columns": "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, phone TEXT, email TEXT",
+        "fields": ["id", "name", "phone", "email"],
+        "indexes": ["name", "phone"],
+    },
+    "finance": {
+        "columns": "id INTEGER PRIMARY KEY AUTOINCREMENT, amount REAL, category TEXT, date TEXT, description TEXT, "
+                   f"day TEXT GENERATED ALWAYS AS ({ISO_DATE.format('date')}) VIRTUAL",
+        "fields": ["id", "amount", "category", "date", "description"],
+        "indexes": ["day", "category"],
+    },
+}
+
+FLUSH_DELAY = 0.2
+CORRUPT_ERRORS = (KeyError, ValueError, struct.error)
+SNAPSHOT_FORMAT = None
+COLUMNS_SUFFIX = ".columns"
+
+DEFAULT_FILES = {
+    "notes": "notes.json",
+    "tasks": "tasks.json",
+    "contacts": "contacts.json",
+    "finance": "finance.json",
+}
+
+
+OPEN_STORAGES = weakref.WeakSet()
+
+
+def flush_all():
+    for storage in list(OPEN_STORAGES):
+        storage.flush()
+
+
+atexit.register(flush_all)
+
+
+def fsync_directory(file_name):
+    if os.name != "posix":
+        return
+    descriptor = os.open(os.path.dirname(os.path.abspath(file_name)), os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def write_atomic(file_name, data):
+    temp_name = file_name + ".tmp"
+    with open(temp_name, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_name, file_name)
+    fsync_directory(file_name)
+
+
+def append_durable(file_name, data):
+    with open(file_name, "ab") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+class JournalStorage:
+    supports_queries = False
+    columnar = False
+
+    def __init__(self, file_name, snapshot, compact_every=1000, flush_delay=None, table=None, snapshot_format=None):
+        self.file_name = file_name
+        self.snapshot_name = file_name
+        self.columns_name = file_name + COLUMNS_SUFFIX
+        self.journal_name = file_name + ".log"
+        self.snapshot = snapshot
+        self.compact_every = compact_every
+        self.flush_delay = FLUSH_DELAY if flush_delay is None else flush_delay
+        self.snapshot_size = 0
+        self.journal_size = 0
+        self.journal_offset = 0
+        self.snapshot_stat = None
+        self.next_id = 1
+        self.pending = None
+        self.discarded = False
+        self.queued = []
+        self.queued_items = None
+        self.timer = None
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.lock_file = os.open(file_name + ".lock", os.O_RDWR | os.O_CREAT, 0o644) if fcntl else None
+        self.codec = serialization.codec_for(snapshot_format or SNAPSHOT_FORMAT or "json", table)
+        OPEN_STORAGES.add(self)
+
+    def __del__(self):
+        if self.lock_file is not None:
+            os.close(self.lock_file)
+
+    @contextmanager
+    def locked(self, exclusive=False):
+        if self.lock_file is None:
+            yield
+            return
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def stat(file_name):
+        try:
+            info = os.stat(file_name)
+        except FileNotFoundError:
+            return None
+        return info.st_ino, info.st_size, info.st_mtime_ns
+
+    def load(self):
+        with self.flush_lock, self.locked():
+            next_id, items = self.read_snapshot()
+            self.snapshot_stat = self.stat(self.snapshot_name)
+            items = {item["id"]: item for item in items}
+            self.next_id = max(items, default=0) + 1 if next_id is None else next_id
+            self.snapshot_size = len(items)
+            self.journal_size = 0
+            self.journal_offset = 0
+            for entry in self.read_journal():
+                if entry["op"] == "delete":
+                    items.pop(entry["id"], None)
+                else:
+                    items[entry["item"]["id"]] = entry["item"]
+        return list(items.values())
+
+    def read_snapshot(self):
+        try:
+            with open(self.file_name, "rb") as file:
+                return serialization.load(file)
+        except FileNotFoundError:
+            pass
+        except CORRUPT_ERRORS:
+            self.back_up_corrupt(self.file_name)
+        store, next_id = self.read_columns()
+        return (next_id, store.to_dicts()) if store is not None else (None, [])
+
+    def read_columns(self):
+        if not os.path.exists(os.path.join(self.columns_name, "meta.json")):
+            return None, None
+        from finance_store import FinanceStore
+
+        try:
+            store, meta = FinanceStore.open_columns(self.columns_name)
+            return store, meta["next_id"]
+        except (FileNotFoundError, *CORRUPT_ERRORS):
+            self.back_up_corrupt(self.columns_name)
+            return None, None
+
+    @staticmethod
+    def back_up_corrupt(name):
+        backup_name = f"{name}.corrupt-{int(time.time())}"
+        os.replace(name, backup_name)
+        print(f"Ошибка: файл {name} повреждён и сохранён как {backup_name}.")
+
+    def write_snapshot(self, next_id, items):
+        write_atomic(self.file_name, self.codec.dump(next_id, items))
+        if os.path.isdir(self.columns_name):
+            shutil.rmtree(self.columns_name)
+
+    def read_journal(self):
+        try:
+            with open(self.journal_name, "rb") as file:
+                file.seek(self.journal_offset)
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = serialization.loads(line)
+                    except ValueError:
+                        break
+                    self.journal_offset += len(line)
+                    self.journal_size += 1
+                    if entry["op"] != "delete":
+                        self.next_id = max(self.next_id, entry["item"]["id"] + 1)
+                    yield entry
+        except FileNotFoundError:
+            pass
+
+    def poll(self):
+        if self.pending is not None:
+            return False, []
+        if self.discarded:
+            self.discarded = False
+            return True, []
+        self.flush()
+        with self.flush_lock, self.locked():
+            if self.stat(self.snapshot_name) != self.snapshot_stat:
+                return True, []
+            journal_stat = self.stat(self.journal_name)
+            journal_size = journal_stat[1] if journal_stat else 0
+            if journal_size == self.journal_offset:
+                return False, []
+            if journal_size < self.journal_offset:
+                return True, []
+            return False, list(self.read_journal())
+
+    def version(self):
+        return "-".join(map(str, (*(self.snapshot_stat or ()), self.journal_offset)))
+
+    def allocate_id(self):
+        return self.allocate_ids(1).start
+
+    def allocate_ids(self, count):
+        with self.locked(exclusive=True):
+            if self.lock_file is not None:
+                stored = os.pread(self.lock_file, 32, 0).strip()
+                self.next_id = max(self.next_id, int(stored) if stored.isdigit() else 0)
+            ids = range(self.next_id, self.next_id + count)
+            self.next_id += count
+            if self.lock_file is not None:
+                os.ftruncate(self.lock_file, 0)
+                os.pwrite(self.lock_file, str(self.next_id).encode("ascii"), 0)
+        return ids
+
+    def create(self, item):
+        self.append({"op": "create", "item": item})
+
+    def create_many(self, items):
+        self.append_many([{"op": "create", "item": item} for item in items])
+
+    def update(self, item):
+        self.append({"op": "update", "item": item})
+
+    def delete(self, item_id):
+        self.append({"op": "delete", "id": item_id})
+
+    def append(self, entry):
+        self.append_many([entry])
+
+    @contextmanager
+    def batch(self):
+        if self.pending is not None:
+            yield
+            return
+        self.pending = []
+        try:
+            yield
+            entries = self.pending
+        except BaseException:
+            self.discarded = True
+            raise
+        finally:
+            self.pending = None
+        if entries:
+            self.append_many(entries)
+
+    def append_many(self, entries):
+        if self.pending is not None:
+            self.pending.extend(entries)
+            return
+        with self.lock:
+            self.queued.extend(entries)
+        self.journal_size += len(entries)
+        if self.journal_size >= max(self.compact_every, self.snapshot_size):
+            self.save(self.snapshot())
+            return
+        self.schedule()
+
+    def save(self, items):
+        with self.lock:
+            self.queued_items = (self.next_id, items, len(self.queued))
+        self.snapshot_size = len(items)
+        self.journal_size = 0
+        self.schedule()
+
+    def schedule(self):
+        if not self.flush_delay:
+            self.flush()
+            return
+        with self.lock:
+            if self.timer is not None:
+                return
+            self.timer = threading.Timer(self.flush_delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                entries, self.queued = self.queued, []
+                snapshot, self.queued_items = self.queued_items, None
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+            if not entries and snapshot is None:
+                return
+            try:
+                with self.locked(exclusive=True):
+                    self.write(entries, snapshot)
+            except OSError as error:
+                with self.lock:
+                    self.queued = entries + self.queued
+                    if self.queued_items is None:
+                        self.queued_items = snapshot
+                    else:
+                        next_id, items, written = self.queued_items
+                        self.queued_items = (next_id, items, written + len(entries))
+                print(f"Ошибка сохранения файла {self.file_name}: {error}")
+
+    def write(self, entries, snapshot):
+        journal_stat = self.stat(self.journal_name)
+        journal_size = journal_stat[1] if journal_stat else 0
+        up_to_date = self.stat(self.snapshot_name) == self.snapshot_stat and journal_size == self.journal_offset
+        if snapshot is not None and up_to_date:
+            next_id, items, written = snapshot
+            self.write_snapshot(next_id, items)
+            if os.path.exists(self.journal_name):
+                os.remove(self.journal_name)
+            self.snapshot_stat = self.stat(self.snapshot_name)
+            self.journal_offset = 0
+            entries = entries[written:]
+        if entries:
+            append_durable(self.journal_name, b"".join(serialization.dumps(entry) + b"\n" for entry in entries))
+            if up_to_date:
+                self.journal_offset = self.stat(self.journal_name)[1]
+
+
+class ColumnarStorage(JournalStorage):
+    columnar = True
+
+    def __init__(self, file_name, snapshot, compact_every=1000, flush_delay=None):
+        super().__init__(file_name, snapshot, compact_every, flush_delay, table="finance")
+        self.snapshot_name = os.path.join(self.columns_name, "meta.json")
+
+    def load(self):
+        return self.load_store().to_dicts()
+
+    def load_store(self):
+        from finance_store import FinanceStore
+
+        with self.flush_lock, self.locked():
+            store, next_id = self.read_columns()
+            if store is None:
+                next_id, items = self.read_snapshot()
+                store = FinanceStore.from_dicts(items)
+            self.snapshot_stat = self.stat(self.snapshot_name)
+            self.snapshot_size = len(store)
+            self.next_id = (int(store.ids[len(store) - 1]) + 1 if len(store) else 1) if next_id is None else next_id
+            self.journal_size = 0
+            self.journal_offset = 0
+            entries = list(self.read_journal())
+        return store.apply_entries(entries) if entries else store
+
+    def write_snapshot(self, next_id, items):
+        from finance_store import FinanceStore
+
+        store = items if isinstance(items, FinanceStore) else FinanceStore.from_dicts(items)
+        try:
+            with open(self.snapshot_name, "rb") as file:
+                generation = serialization.loads(file.read())["generation"] + 1
+        except FileNotFoundError:
+            generation = 1
+        meta = store.write_columns(self.columns_name, generation)
+        meta["next_id"] = next_id
+        write_atomic(self.snapshot_name, serialization.dumps(meta))
+        suffix = f"-{generation}.col"
+        for name in os.listdir(self.columns_name):
+            if name.endswith(".col") and not name.endswith(suffix):
+                os.remove(os.path.join(self.columns_name, name))
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+
+
+class SQLiteDatabase:
+    def __init__(self, db_name):
+        self.connection = sqlite3.connect(db_name, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.in_batch = False
+        self.rollbacks = 0
+
+    @contextmanager
+    def batch(self):
+        if self.in_batch:
+            yield
+            return
+        self.in_batch = True
+        try:
+            with self.connection:
+                yield
+        except BaseException:
+            self.rollbacks += 1
+            raise
+        finally:
+            self.in_batch = False
+
+    def transaction(self):
+        return nullcontext() if self.in_batch else self.connection
+
+
+DATABASES = weakref.WeakValueDictionary()
+
+
+def open_database(db_name):
+    key = os.path.abspath(db_name)
+    database = DATABASES.get(key)
+    if database is None:
+        database = DATABASES[key] = SQLiteDatabase(db_name)
+    return database
+
+
+class SQLiteStorage:
+    supports_queries = True
+    columnar = False
+
+    def __init__(self, db_name, table):
+        self.db_name = db_name
+        self.table = table
+        self.fields = SCHEMAS[table]["fields"]
+        self.database = open_database(db_name)
+        self.connection = self.database.connection
+        self.next_id = 1
+        self.data_version = None
+        self.rollbacks = self.database.rollbacks
+        with self.transaction():
+            if not self.connection.in_transaction:
+                self.connection.execute("BEGIN")
+            self.migrate_table()
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({SCHEMAS[table]['columns']})")
+            for column in SCHEMAS[table]["indexes"]:
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+            self.connection.execute(
+                f"INSERT INTO sqlite_sequence (name, seq) SELECT ?, (SELECT coalesce(max(id), 0) FROM {table}) "
+                "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)",
+                (table, table),
+            )
+
+    def migrate_table(self):
+        row = self.connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (self.table,)
+        ).fetchone()
+        if row is None or "AUTOINCREMENT" in row["sql"].upper():
+            return
+        fields = ", ".join(self.fields)
+        self.connection.execute(f"ALTER TABLE {self.table} RENAME TO {self.table}_old")
+        self.connection.execute(f"CREATE TABLE {self.table} ({SCHEMAS[self.table]['columns']})")
+        self.connection.execute(f"INSERT INTO {self.table} ({fields}) SELECT {fields} FROM {self.table}_old")
+        self.connection.execute(f"DROP TABLE {self.table}_old")
+
+    @property
+    def in_batch(self):
+        return self.database.in_batch
+
+    def batch(self):
+        return self.database.batch()
+
+    def flush(self):
+        pass
+
+    def transaction(self):
+        return self.database.transaction()
+
+    def to_item(self, row):
+        item = {field: row[field] for field in self.fields}
+        if "done" in item:
+            item["done"] = bool(item["done"])
+        return item
+
+    def load(self):
+        self.data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        self.rollbacks = self.database.rollbacks
+        row = self.connection.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (self.table,)).fetchone()
+        self.next_id = (row["seq"] if row else 0) + 1
+        return self.find()
+
+    def poll(self):
+        if self.in_batch:
+            return False, []
+        data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        changed = data_version != self.data_version or self.rollbacks != self.database.rollbacks
+        self.data_version = data_version
+        self.rollbacks = self.database.rollbacks
+        return changed, []
+
+    def version(self):
+        return None
+
+    def allocate_id(self):
+        return self.allocate_ids(1).start
+
+    def find(self, where="", params=(), order_by="id", limit=None):
+        query = f"SELECT {', '.join(self.fields)} FROM {self.table}"
+        if where:
+            query += f" WHERE {where}"
+        query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return [self.to_item(row) for row in self.connection.execute(query, params)]
+
+    def distinct(self, column):
+        return [row[0] for row in self.connection.execute(f"SELECT DISTINCT {column} FROM {self.table}")]
+
+    def allocate_ids(self, count):
+        with self.transaction():
+            self.connection.execute(
+                "UPDATE sqlite_sequence SET seq = max(seq, ?) + ? WHERE name = ?",
+                (self.next_id - 1, count, self.table),
+            )
+            last_id = self.connection.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (self.table,)).fetchone()["seq"]
+        self.next_id = last_id + 1
+        return range(last_id - count + 1, last_id + 1)
+
+    def create(self, item):
+        self.create_many([item])
+
+    def create_many(self, items):
+        placeholders = ", ".join("?" for _ in self.fields)
+        with self.transaction():
+            self.connection.executemany(
+                f"INSERT INTO {self.table} ({', '.join(self.fields)}) VALUES ({placeholders})",
+                ([item[field] for field in self.fields] for item in items),
+            )
+
+    def update(self, item):
+        assignments = ", ".join(f"{field} = ?" for field in self.fields[1:])
+        with self.transaction():
+            self.connection.execute(
+                f"UPDATE {self.table} SET {assignments} WHERE id = ?",
+                [item[field] for field in self.fields[1:]] + [item["id"]],
+            )
+
+    def delete(self, item_id):
+        with self.transaction():
+            self.connection.execute(f"DELETE FROM {self.table} WHERE id = ?", (item_id,))
+
+    def save(self, items):
+        placeholders = ", ".join("?" for _ in self.fields)
+        with self.transaction():
+            self.connection.execute(f"DELETE FROM {self.table}")
+            self.connection.executemany(
+                f"INSERT INTO {self.table} ({', '.join(self.fields)}) VALUES ({placeholders})",
+                ([item[field] for field in self.fields] for item in items),
+            )
+            self.connection.execute("DELETE FROM sqlite_sequence WHERE name = ?", (self.table,))
+            self.connection.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (self.table, self.next_id - 1))
+
+
+def make_storage(file_name, table, snapshot, flush_delay=None):
+    if file_name.endswith((".db", ".sqlite", ".sqlite3")):
+        return SQLiteStorage(file_name, table)
+    if table == "finance" and (SNAPSHOT_FORMAT == "columns" or (
+            SNAPSHOT_FORMAT is None and os.path.exists(os.path.join(file_name + COLUMNS_SUFFIX, "meta.json")))):
+        return ColumnarStorage(file_name, snapshot, flush_delay=flush_delay)
+    return JournalStorage(file_name, snapshot, flush_delay=flush_delay, table=table)
+
+
+def migrate_to_sqlite(db_name, files=None):
+    files = files or DEFAULT_FILES
+    for table, file_name in files.items():
+        source = JournalStorage(file_name, list, flush_delay=0)
+        items = source.load()
+        target = SQLiteStorage(db_name, table)
+        target.next_id = source.next_id
+        target.save(items)
+        print(f"{file_name}: перенесено записей — {len(items)}.")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Использование: python storage.py <файл базы данных .db>")
+        sys.exit(1)
+    migrate_to_sqlite(sys.argv[1])
@@ -0,0 +1,92 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+
+from task_schedule import due_ordinal
+
+
+SORT_KEYS = ("id", "due_date", "priority", "title")
+NO_DATE = float("inf")
+
+
+class TaskIndex:
+    def __init__(self, priorities):
+        self.ranks = {priority: rank for rank, priority in enumerate(priorities)}
+        self.clear()
+
+    def clear(self):
+        self.by_done = {True: set(), False: set()}
+        self.by_priority = {}
+        self.by_day = {}
+        self.days = []
+        self.keys = {}
+
+    def add(self, task):
+        self.discard(task.id)
+        day = due_ordinal(task.due_date)
+        self.by_done[bool(task.done)].add(task.id)
+        self.by_priority.setdefault(task.priority, set()).add(task.id)
+        if day not in self.by_day:
+            self.by_day[day] = set()
+            if day is not None:
+                insort(self.days, day)
+        self.by_day[day].add(task.id)
+        self.keys[task.id] = (bool(task.done), task.priority, day)
+
+    def discard(self, task_id):
+        key = self.keys.pop(task_id, None)
+        if key is None:
+            return
+        done, priority, day = key
+        self.by_done[done].discard(task_id)
+        self.by_priority[priority].discard(task_id)
+        bucket = self.by_day[day]
+        bucket.discard(task_id)
+        if not bucket:
+            del self.by_day[day]
+            if day is not None:
+                del self.days[bisect_left(self.days, day)]
+
+    def rebuild(self, tasks):
+        self.clear()
+        for task in tasks:
+            self.add(task)
+
+    def due_range(self, first, last):
+        start = bisect_left(self.days, first) if first is not None else 0
+        stop = bisect_right(self.days, last) if last is not None else len(self.days)
+        return set().union(*(self.by_day[day] for day in self.days[start:stop]))
+
+    def select(self, done=None, priority=None, due_from=None, due_to=None):
+        candidates = []
+        if done is not None:
+            candidates.append(self.by_done[bool(done)])
+        if priority is not None:
+            candidates.append(self.by_priority.get(priority, set()))
+        if due_from is not None or due_to is not None:
+            candidates.append(self.due_range(due_from, due_to))
+        if not candidates:
+            return set(self.keys)
+        candidates.sort(key=len)
+        return candidates[0].intersection(*candidates[1:])
+
+    def sort_key(self, sort_by, tasks):
+        if sort_by == "id":
+            return lambda task_id: task_id
+        if sort_by == "title":
+            return lambda task_id: (tasks[task_id].title.lower(), task_id)
+        if sort_by == "due_date":
+            return lambda task_id: (
+                self.keys[task_id][2] or NO_DATE, self.ranks.get(self.keys[task_id][1], len(self.ranks)), task_id
+            )
+        if sort_by == "priority":
+            return lambda task_id: (
+                self.ranks.get(self.keys[task_id][1], len(self.ranks)), self.keys[task_id][2] or NO_DATE, task_id
+            )
+        raise ValueError(f"неизвестное поле сортировки: {sort_by}")
+
+    def page(self, task_ids, tasks, sort_by="id", descending=False, offset=0, limit=None):
+        key = self.sort_key(sort_by, tasks)
+        if limit is None:
+            return sorted(task_ids, key=key, reverse=descending)[offset:]
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(offset + limit, task_ids, key=key)[offset:]
@@ -0,0 +1,113 @@
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=65536)
+def due_ordinal(due_date):
+    if not due_date:
+        return None
+    try:
+        return datetime.strptime(due_date, "%d-%m-%Y").toordinal()
+    except ValueError:
+        return None
+
+
+class DueSchedule:
+    def __init__(self, priorities):
+        self.ranks = {priority: rank for rank, priority in enumerate(priorities)}
+        self.keys = []
+        self.positions = {}
+        self.lock = threading.Lock()
+
+    def key(self, task):
+        if task.done:
+            return None
+        ordinal = due_ordinal(task.due_date)
+        if ordinal is None:
+            return None
+        return ordinal, self.ranks.get(task.priority, len(self.ranks)), task.id
+
+    def add(self, task):
+        key = self.key(task)
+        with self.lock:
+            self.remove_key(task.id)
+            if key is not None:
+                insort(self.keys, key)
+                self.positions[task.id] = key
+
+    def discard(self, task_id):
+        with self.lock:
+            self.remove_key(task_id)
+
+    def remove_key(self, task_id):
+        key = self.positions.pop(task_id, None)
+        if key is not None:
+            del self.keys[bisect_left(self.keys, key)]
+
+    def rebuild(self, tasks):
+        keys = [key for key in map(self.key, tasks) if key is not None]
+        keys.sort()
+        with self.lock:
+            self.keys = keys
+            self.positions = {key[2]: key for key in keys}
+
+    def next_due(self, count, today):
+        with self.lock:
+            start = bisect_left(self.keys, (today,))
+            return [key[2] for key in self.keys[start:start + count]]
+
+    def overdue(self, today):
+        with self.lock:
+            return [key[2] for key in self.keys[:bisect_left(self.keys, (today,))]]
+
+    def due_between(self, first, last):
+        with self.lock:
+            start = bisect_left(self.keys, (first,))
+            stop = bisect_left(self.keys, (last + 1,), start)
+            return [key[2] for key in self.keys[start:stop]]
+
+    def next_after(self, ordinal):
+        with self.lock:
+            position = bisect_left(self.keys, (ordinal + 1,))
+            return self.keys[position][0] if position < len(self.keys) else None
+
+
+class Reminder:
+    def __init__(self, schedule, callback, lead_days=0):
+        self.schedule = schedule
+        self.callback = callback
+        self.lead_days = lead_days
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def notify(self):
+        with self.condition:
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+
+    def run(self):
+        last_day = date.today().toordinal()
+        with self.condition:
+            while not self.stopped:
+                today = date.today().toordinal()
+                if today > last_day:
+                    task_ids = self.schedule.due_between(last_day + 1 + self.lead_days, today + self.lead_days)
+                    last_day = today
+                    if task_ids:
+                        self.callback(task_ids)
+                    continue
+                ordinal = self.schedule.next_after(today + self.lead_days)
+                if ordinal is None:
+                    self.condition.wait()
+                    continue
+                wake = datetime.combine(date.fromordinal(ordinal - self.lead_days), datetime.min.time())
+                self.condition.wait(max((wake - datetime.now()).total_seconds(), 0) + 0.001)
@@ -1,6 +1,14 @@
-import json
-import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
+
+from csv_import import ImportReport, parse_dates, read_csv_chunks
+from paging import PAGE_SIZE, show_pages
+from storage import make_storage
+from task_index import SORT_KEYS, TaskIndex
+from task_schedule import DueSchedule, Reminder, due_ordinal
+
+
+PRIORITIES = ["Высокий", "Средний", "Низкий"]
+DONE_VALUES = {"true": True, "false": False, "1": True, "0": False, "": False}
 
 
 class Task:
@@ -37,121 +45,297 @@ class Task:
 class TasksManager:
     def __init__(self, file_name="tasks.json"):
         self.file_name = file_name
+        self.storage = make_storage(file_name, "tasks", self.dump_tasks)
         self.tasks = self.load_tasks()
+        self.index = TaskIndex(PRIORITIES)
+        self.index.rebuild(self.tasks.values())
+        self.schedule = DueSchedule(PRIORITIES)
+        self.schedule.rebuild(self.tasks.values())
+        self.reminder = None
 
     def load_tasks(self):
-        try:
-            with open(self.file_name, "r", encoding="utf-8") as file:
-                return [Task.from_dict(task) for task in json.load(file)]
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        tasks = (Task.from_dict(task) for task in self.storage.load())
+        return {task.id: task for task in tasks}
 
     def save_tasks(self):
-        with open(self.file_name, "w", encoding="utf-8") as file:
-            json.dump([task.to_dict() for task in self.tasks], file, indent=4, ensure_ascii=False)
+        self.storage.save(self.dump_tasks())
+
+    def dump_tasks(self):
+        return [task.to_dict() for task in self.tasks.values()]
+
+    def batch(self):
+        return self.storage.batch()
+
+    def refresh(self):
+        reload, entries = self.storage.poll()
+        if reload:
+            self.tasks = self.load_tasks()
+            self.index.rebuild(self.tasks.values())
+            self.schedule.rebuild(self.tasks.values())
+            if self.reminder is not None:
+                self.reminder.notify()
+        for entry in entries:
+            if entry["op"] == "delete":
+                self.tasks.pop(entry["id"], None)
+                self.unindex_task(entry["id"])
+            else:
+                task = Task.from_dict(entry["item"])
+                self.tasks[task.id] = task
+                self.index_task(task)
+
+    def start_reminders(self, callback, lead_days=0):
+        if self.reminder is None:
+            self.reminder = Reminder(self.schedule, lambda task_ids: callback(self.get_tasks(task_ids)), lead_days)
+
+    def stop_reminders(self):
+        if self.reminder is not None:
+            self.reminder.stop()
+            self.reminder = None
+
+    def index_task(self, task):
+        self.index.add(task)
+        self.schedule.add(task)
+        if self.reminder is not None:
+            self.reminder.notify()
+
+    def unindex_task(self, task_id):
+        self.index.discard(task_id)
+        self.schedule.discard(task_id)
+
+    def get_tasks(self, task_ids):
+        return [self.tasks[task_id] for task_id in task_ids if task_id in self.tasks]
+
+    @staticmethod
+    def today():
+        return date.today().toordinal()
+
+    def next_due(self, count=10):
+        return self.get_tasks(self.schedule.next_due(count, self.today()))
+
+    def overdue(self):
+        return self.get_tasks(self.schedule.overdue(self.today()))
+
+    def due_between(self, date_from, date_to):
+        if not (date_from and date_to):
+            raise ValueError("нужно указать обе даты.")
+        self.validate_due_date(date_from)
+        self.validate_due_date(date_to)
+        return self.get_tasks(self.schedule.due_between(due_ordinal(date_from), due_ordinal(date_to)))
+
+    @staticmethod
+    def validate_due_date(due_date):
+        if due_date:
+            try:
+                datetime.strptime(due_date, "%d-%m-%Y")
+            except ValueError:
+                raise ValueError("неверный формат даты.") from None
+
+    def insert(self, title, description="", priority="Средний", due_date=None, done=False):
+        title = title.strip()
+        if not title:
+            raise ValueError("название задачи не может быть пустым.")
+        if priority not in PRIORITIES:
+            raise ValueError("неверный приоритет.")
+        self.validate_due_date(due_date)
+        task = Task(self.storage.allocate_id(), title, description.strip(), done=done, priority=priority, due_date=due_date)
+        self.tasks[task.id] = task
+        self.index_task(task)
+        self.storage.create(task.to_dict())
+        return task
+
+    def update(self, task_id, title=None, description=None, priority=None, due_date=None, done=None):
+        task = self.tasks.get(task_id)
+        if task is None:
+            raise ValueError("задача с таким ID не найдена.")
+        if priority and priority not in PRIORITIES:
+            raise ValueError("неверный приоритет.")
+        self.validate_due_date(due_date)
+        if title:
+            task.title = title
+        if description:
+            task.description = description
+        if priority:
+            task.priority = priority
+        if due_date:
+            task.due_date = due_date
+        if done is not None:
+            task.done = done
+        self.index_task(task)
+        self.storage.update(task.to_dict())
+        return task
+
+    def complete(self, task_id):
+        return self.update(task_id, done=True)
+
+    def remove(self, task_id):
+        if task_id not in self.tasks:
+            raise ValueError("задача с таким ID не найдена.")
+        del self.tasks[task_id]
+        self.unindex_task(task_id)
+        self.storage.delete(task_id)
+
+    def select(self, done=None, priority=None, due_from=None, due_to=None):
+        if priority is not None and priority not in PRIORITIES:
+            raise ValueError("неверный приоритет.")
+        self.validate_due_date(due_from)
+        self.validate_due_date(due_to)
+        return self.index.select(done, priority, due_ordinal(due_from), due_ordinal(due_to))
+
+    def query(self, done=None, priority=None, due_from=None, due_to=None, sort_by="id", descending=False, offset=0, limit=None):
+        task_ids = self.select(done, priority, due_from, due_to)
+        page = self.index.page(task_ids, self.tasks, sort_by, descending, offset, limit)
+        return [self.tasks[task_id] for task_id in page], len(task_ids)
+
+    def stream(self, done=None, priority=None, due_from=None, due_to=None, sort_by="id", descending=False, page_size=PAGE_SIZE):
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"неизвестное поле сортировки: {sort_by}")
+        task_ids = self.select(done, priority, due_from, due_to)
+        return self.iter_sorted(task_ids, sort_by, descending, page_size), len(task_ids)
+
+    def iter_sorted(self, task_ids, sort_by, descending, page_size):
+        head = self.index.page(task_ids, self.tasks, sort_by, descending, limit=page_size + 1)
+        yield from self.existing(head)
+        if len(task_ids) > len(head):
+            yield from self.existing(self.index.page(task_ids, self.tasks, sort_by, descending, offset=len(head)))
+
+    def existing(self, task_ids):
+        for task_id in task_ids:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                yield task
 
     def mark_task_done(self):
         try:
             task_id = int(input("Введите ID задачи для отметки как выполненной: "))
-            task = next((task for task in self.tasks if task.id == task_id), None)
         except ValueError:
             print("Ошибка: ID должен быть числом.")
             return
-        if task:
-            task.done = True
-            self.save_tasks()
+        try:
+            self.complete(task_id)
             print(f"Задача с ID {task_id} отмечена как выполненная.")
-        else:
-            print("Ошибка: задача с таким ID не найдена.")
+        except ValueError as e:
+            print(f"Ошибка: {e}")
 
     def add_task(self):
-        task_id = max([task.id for task in self.tasks], default=0) + 1
         title = input("Введите название задачи: ").strip()
         if not title:
             print("Ошибка: название задачи не может быть пустым.")
             return
         description = input("Введите описание задачи: ").strip()
         priority = input("Введите приоритет задачи (Высокий/Средний/Низкий): ").strip()
-        if priority not in ["Высокий", "Средний", "Низкий"]:
+        if priority not in PRIORITIES:
             print("Ошибка: неверный приоритет. Установлен приоритет по умолчанию — 'Средний'.")
             priority = "Средний"
         due_date = input("Введите срок выполнения (в формате ДД-ММ-ГГГГ): ").strip()
-        if due_date:
-            try:
-                datetime.strptime(due_date, "%d-%m-%Y")
-            except ValueError:
-                print("Ошибка: неверный формат даты. Задача сохранена без срока выполнения.")
-                due_date = None
-        new_task = Task(task_id, title, description, priority=priority, due_date=due_date)
-        self.tasks.append(new_task)
-        self.save_tasks()
+        try:
+            self.validate_due_date(due_date)
+        except ValueError:
+            print("Ошибка: неверный формат даты. Задача сохранена без срока выполнения.")
+            due_date = None
+        self.insert(title, description, priority=priority, due_date=due_date)
         print(f"Задача успешно добавлена!")
 
-    def view_tasks(self, filter_by=None, filter_value=None):
+    def view_tasks(self):
         if not self.tasks:
             print("Список задач пуст.")
             return
 
-        tasks = self.tasks
-        if filter_by == "status":
-            tasks = [task for task in tasks if task.done == filter_value]
-        elif filter_by == "priority":
-            tasks = [task for task in tasks if task.priority == filter_value]
-        elif filter_by == "due_date":
-            tasks = [task for task in tasks if task.due_date == filter_value]
+        options = {}
+        if input("Настроить фильтры и сортировку? (д/н): ").strip().lower() in ("д", "да", "y"):
+            try:
+                options = self.ask_filters()
+            except ValueError as e:
+                print(f"Ошибка: {e}")
+                return
 
-        if not tasks:
-            print("Нет задач, соответствующих выбранным фильтрам.")
+        try:
+            tasks, total = self.stream(**options)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
             return
+        show_pages(tasks, self.format_task, "Список задач:", "Нет задач, соответствующих выбранным фильтрам.", total=total)
 
-        print("Список задач:")
+    @staticmethod
+    def ask_filters():
+        status = input("Статус (выполнена/не выполнена, пусто — все): ").strip().lower()
+        priority = input("Приоритет (Высокий/Средний/Низкий, пусто — все): ").strip()
+        due_from = input("Срок с (ДД-ММ-ГГГГ, пусто — без ограничения): ").strip()
+        due_to = input("Срок по (ДД-ММ-ГГГГ, пусто — без ограничения): ").strip()
+        sort_by = input(f"Сортировка ({'/'.join(SORT_KEYS)}, пусто — id): ").strip() or "id"
+        if status not in ("", "выполнена", "не выполнена"):
+            raise ValueError("неверный статус.")
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"неизвестное поле сортировки: {sort_by}")
+        return {
+            "done": None if not status else status == "выполнена",
+            "priority": priority or None,
+            "due_from": due_from or None,
+            "due_to": due_to or None,
+            "sort_by": sort_by,
+        }
+
+    @staticmethod
+    def format_task(task):
+        status = "Выполнена" if task.done else "Не выполнена"
+        return f"[ID: {task.id}] {task.title} | Статус: {status} | Приоритет: {task.priority} | Срок: {task.due_date or 'Не задан'}"
+
+    @staticmethod
+    def print_reminder(tasks):
         for task in tasks:
-            status = "Выполнена" if task.done else "Не выполнена"
-            print(f"[ID: {task.id}] {task.title} | Статус: {status} | Приоритет: {task.priority} | Срок: {task.due_date or 'Не задан'}")
+            print(f"\nНапоминание: наступил срок задачи [ID: {task.id}] {task.title} ({task.due_date}).")
+
+    def view_deadlines(self, count=10):
+        overdue = self.overdue()
+        upcoming = self.next_due(count)
+        if not overdue and not upcoming:
+            print("Нет невыполненных задач со сроком выполнения.")
+            return
+        if overdue:
+            print("Просроченные задачи:")
+            for task in overdue:
+                print(self.format_task(task))
+        if upcoming:
+            print("Ближайшие задачи:")
+            for task in upcoming:
+                print(self.format_task(task))
 
     def edit_task(self):
         try:
             task_id = int(input("Введите ID задачи для редактирования: "))
-            task = next((task for task in self.tasks if task.id == task_id), None)
-            if task:
-                new_title = input("Введите новое краткое описание задачи (оставьте пустым для сохранения текущего): ").strip()
-                new_description = input("Введите новое подробное описание задачи (оставьте пустым для сохранения текущего): ").strip()
-                new_priority = input("Введите новый приоритет задачи (Высокий, Средний, Низкий) или оставьте пустым: ").strip()
-                new_due_date = input("Введите новый срок выполнения задачи (ДД-ММ-ГГГГ) или оставьте пустым: ").strip()
-
-                if new_title:
-                    task.title = new_title
-                if new_description:
-                    task.description = new_description
-                if new_priority in ["Высокий", "Средний", "Низкий"]:
-                    task.priority = new_priority
-                elif new_priority:
-                    print("Ошибка: неверный приоритет. Сохранён текущий приоритет.")
-                if new_due_date:
-                    try:
-                        datetime.strptime(new_due_date, "%d-%m-%Y")
-                        task.due_date = new_due_date
-                    except ValueError:
-                        print("Ошибка: неверный формат даты. Срок выполнения сохранён без изменений.")
-
-                self.save_tasks()
-                print(f"Задача с ID {task_id} успешно обновлена.")
-            else:
-                print("Ошибка: задача с таким ID не найдена.")
         except ValueError:
             print("Ошибка: ID должен быть числом.")
+            return
+        if task_id not in self.tasks:
+            print("Ошибка: задача с таким ID не найдена.")
+            return
+        new_title = input("Введите новое краткое описание задачи (оставьте пустым для сохранения текущего): ").strip()
+        new_description = input("Введите новое подробное описание задачи (оставьте пустым для сохранения текущего): ").strip()
+        new_priority = input("Введите новый приоритет задачи (Высокий, Средний, Низкий) или оставьте пустым: ").strip()
+        new_due_date = input("Введите новый срок выполнения задачи (ДД-ММ-ГГГГ) или оставьте пустым: ").strip()
+
+        if new_priority and new_priority not in PRIORITIES:
+            print("Ошибка: неверный приоритет. Сохранён текущий приоритет.")
+            new_priority = None
+        try:
+            self.validate_due_date(new_due_date)
+        except ValueError:
+            print("Ошибка: неверный формат даты. Срок выполнения сохранён без изменений.")
+            new_due_date = None
+
+        self.update(task_id, new_title, new_description, new_priority, new_due_date)
+        print(f"Задача с ID {task_id} успешно обновлена.")
 
     def delete_task(self):
         try:
             task_id = int(input("Введите ID задачи для удаления: "))
-            if any(task.id == task_id for task in self.tasks):
-                self.tasks = [task for task in self.tasks if task.id != task_id]
-                self.save_tasks()
-                print(f"Задача с ID {task_id} успешно удалена.")
-            else:
-                print("Ошибка: задача с таким ID не найдена.")
         except ValueError:
             print("Ошибка: ID должен быть числом.")
+            return
+        try:
+            self.remove(task_id)
+            print(f"Задача с ID {task_id} успешно удалена.")
+        except ValueError as e:
+            print(f"Ошибка: {e}")
 
     def export_tasks_to_csv(self):
         if not self.tasks:
@@ -161,8 +345,10 @@ class TasksManager:
         if not file_name.endswith(".csv"):
             print("Ошибка: имя файла должно заканчиваться на .csv.")
             return
+        import pandas as pd
+
         try:
-            df = pd.DataFrame([task.to_dict() for task in self.tasks])
+            df = pd.DataFrame(self.dump_tasks())
             df.to_csv(file_name, index=False, encoding="utf-8")
             print(f"Задачи успешно экспортированы в файл {file_name}.")
         except Exception as e:
@@ -170,23 +356,48 @@ class TasksManager:
 
     def import_tasks_from_csv(self):
         file_name = input("Введите имя файла для импорта: ").strip()
+        import pandas as pd
+
         try:
-            df = pd.read_csv(file_name, encoding="utf-8")
-            if not {"title", "description", "done", "priority", "due_date"}.issubset(df.columns):
-                print("Ошибка: некорректный формат файла.")
-                return
-            max_id = max([task.id for task in self.tasks], default=0)
-            for _, row in df.iterrows():
-                max_id += 1
-                self.tasks.append(Task(
-                    task_id=max_id,
-                    title=row["title"],
-                    description=row["description"],
-                    done=row["done"],
-                    priority=row["priority"],
-                    due_date=row["due_date"]
-                ))
-            self.save_tasks()
+            report = ImportReport()
+            for chunk in read_csv_chunks(file_name):
+                if not {"title", "description", "done", "priority", "due_date"}.issubset(chunk.columns):
+                    print("Ошибка: некорректный формат файла.")
+                    return
+                titles = chunk["title"].str.strip()
+                done = chunk["done"].str.strip().str.lower().map(DONE_VALUES)
+                priorities = chunk["priority"].str.strip()
+                due_dates = chunk["due_date"].str.strip()
+                bad_title = titles == ""
+                bad_done = ~bad_title & done.isna()
+                bad_priority = ~(bad_title | bad_done) & ~priorities.isin(PRIORITIES)
+                bad_date = ~(bad_title | bad_done | bad_priority) & (due_dates != "") & parse_dates(due_dates).isna()
+                report.reject(chunk, bad_title, "пустое название задачи")
+                report.reject(chunk, bad_done, "некорректный статус выполнения")
+                report.reject(chunk, bad_priority, "неверный приоритет")
+                report.reject(chunk, bad_date, "некорректный срок выполнения")
+
+                valid = ~(bad_title | bad_done | bad_priority | bad_date)
+                count = int(valid.sum())
+                if not count:
+                    continue
+                new_tasks = [
+                    Task(task_id, title, description, done=task_done, priority=priority, due_date=due_date)
+                    for task_id, title, description, task_done, priority, due_date in zip(
+                        self.storage.allocate_ids(count),
+                        titles[valid].tolist(),
+                        chunk["description"][valid].str.strip().tolist(),
+                        done[valid].astype(bool).tolist(),
+                        priorities[valid].tolist(),
+                        due_dates[valid].tolist(),
+                    )
+                ]
+                for task in new_tasks:
+                    self.tasks[task.id] = task
+                    self.index_task(task)
+                self.storage.create_many([task.to_dict() for task in new_tasks])
+                report.imported += count
+            report.summary()
             print(f"Задачи успешно импортированы из файла {file_name}.")
         except FileNotFoundError:
             print("Ошибка: файл не найден.")